@@ -0,0 +1,216 @@
+import time
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+import main
+
+try:
+    import gymnasium
+    GYM_OK = True
+except ImportError:
+    GYM_OK = False
+
+# Ação = máscara de teclas (bits W A S D ESPAÇO), a mesma gravada nos replays
+NUM_ACOES = len(main.TECLAS_POR_MASCARA)
+
+MAX_INIMIGOS_OBS = 16
+MAX_TIROS_CHEFAO_OBS = 8
+# jogador: x, y, vida, transformado, tiro triplo, velocidade; chefão: vida, em luta
+TAMANHO_JOGADOR_OBS = 8
+# por inimigo: dx, dy, é caçador, presente; por tiro do chefão: dx, dy, vx, vy, presente
+TAMANHO_OBS = TAMANHO_JOGADOR_OBS + MAX_INIMIGOS_OBS * 4 + MAX_TIROS_CHEFAO_OBS * 5
+
+ESTADOS_EM_JOGO = ("NORMAL", "BOSS", "BOSS_INCOMING")
+
+
+def mais_proximos(posicoes, origem, maximo):
+    # Índices dos `maximo` pontos mais próximos da origem, do mais perto ao mais longe
+    distancias = ((posicoes - origem) ** 2).sum(axis=1)
+    if len(distancias) > maximo:
+        indices = np.argpartition(distancias, maximo)[:maximo]
+        return indices[np.argsort(distancias[indices])]
+    return np.argsort(distancias)
+
+
+class AmbienteRobotDefense:
+    # Uma partida sem janela com interface no estilo Gym:
+    #   reset(seed) -> (obs, info); step(acao) -> (obs, recompensa, terminado, truncado, info)
+    # O estado do jogo vive nos globais de main, então só cabe um ambiente por processo;
+    # para vários em paralelo use AmbienteVetorizado.
+    def __init__(self, passos_por_acao=1, max_passos=main.TICKS_POR_SEGUNDO * 60 * 5):
+        self.passos_por_acao = passos_por_acao
+        self.max_passos = max_passos
+        self.passos = 0
+        self.escala = np.array([main.LARGURA, main.ALTURA], dtype=np.float32)
+        if GYM_OK:
+            self.action_space = gymnasium.spaces.Discrete(NUM_ACOES)
+            self.observation_space = gymnasium.spaces.Box(-np.inf, np.inf, (TAMANHO_OBS,), np.float32)
+
+    def reset(self, seed=None):
+        main.iniciar_partida(seed)
+        self.passos = 0
+        return self.observacao(), {"semente": main.semente_partida}
+
+    def step(self, acao):
+        teclas = main.TECLAS_POR_MASCARA[acao]
+        pontos_antes = main.pontos
+        vida_antes = main.jogador.vida
+
+        for _ in range(self.passos_por_acao):
+            main.atualizar_simulacao(teclas)
+            self.passos += 1
+            if main.estado_jogo not in ESTADOS_EM_JOGO:
+                break
+
+        # Pontos ganhos menos vidas perdidas; vida recuperada por power-up não conta
+        recompensa = float(main.pontos - pontos_antes) - max(0, vida_antes - main.jogador.vida)
+        terminado = main.estado_jogo not in ESTADOS_EM_JOGO
+        truncado = not terminado and self.passos >= self.max_passos
+        info = {"pontos": main.pontos, "vida": main.jogador.vida, "estado": main.estado_jogo, "passos": self.passos}
+        return self.observacao(), recompensa, terminado, truncado, info
+
+    def observacao(self, saida=None):
+        obs = np.zeros(TAMANHO_OBS, dtype=np.float32) if saida is None else saida
+        obs[:] = 0.0
+        jogador = main.jogador
+        centro = np.array(jogador.rect.center, dtype=np.float32)
+
+        obs[0:2] = centro / self.escala
+        obs[2] = jogador.vida / 5
+        obs[3] = jogador.transformado
+        obs[4] = main.tempo_tirotriplo / (main.TICKS_POR_SEGUNDO * 5)
+        obs[5] = main.tempo_velocidade / (main.TICKS_POR_SEGUNDO * 5)
+        obs[6] = main.chefao.vida / main.VIDA_CHEFAO if main.chefao else 0.0
+        obs[7] = main.estado_jogo in ("BOSS", "BOSS_INCOMING")
+
+        inicio = TAMANHO_JOGADOR_OBS
+        robos = main.inimigos.sprites()
+        if robos:
+            posicoes = np.array([r.rect.center for r in robos], dtype=np.float32)
+            indices = mais_proximos(posicoes, centro, MAX_INIMIGOS_OBS)
+            bloco = obs[inicio:inicio + MAX_INIMIGOS_OBS * 4].reshape(MAX_INIMIGOS_OBS, 4)
+            bloco[:len(indices), 0:2] = (posicoes[indices] - centro) / self.escala
+            bloco[:len(indices), 2] = [isinstance(robos[i], main.RoboCacador) for i in indices]
+            bloco[:len(indices), 3] = 1.0
+
+        inicio += MAX_INIMIGOS_OBS * 4
+        tiros = main.tiros_chefao.sprites()
+        if tiros:
+            posicoes = np.array([t.rect.center for t in tiros], dtype=np.float32)
+            indices = mais_proximos(posicoes, centro, MAX_TIROS_CHEFAO_OBS)
+            bloco = obs[inicio:inicio + MAX_TIROS_CHEFAO_OBS * 5].reshape(MAX_TIROS_CHEFAO_OBS, 5)
+            bloco[:len(indices), 0:2] = (posicoes[indices] - centro) / self.escala
+            bloco[:len(indices), 2:4] = [(tiros[i].dx, tiros[i].dy) for i in indices]
+            bloco[:len(indices), 4] = 1.0
+
+        return obs
+
+
+def _trabalhador(conexao, nome_memoria, indice, kwargs):
+    # Processo de um ambiente: escreve a observação direto na sua linha da memória compartilhada
+    # e devolve pela conexão só recompensa, fim e info.
+    memoria = SharedMemory(name=nome_memoria)
+    ambiente = AmbienteRobotDefense(**kwargs)
+    obs = np.ndarray(TAMANHO_OBS, dtype=np.float32, buffer=memoria.buf, offset=indice * TAMANHO_OBS * 4)
+    try:
+        while True:
+            comando, dado = conexao.recv()
+            if comando == "step":
+                _, recompensa, terminado, truncado, info = ambiente.step(dado)
+                if terminado or truncado:
+                    # Reinicia sozinho, como nos vetores do Gym; a última observação fica no info
+                    info["obs_final"] = ambiente.observacao()
+                    ambiente.reset()
+                ambiente.observacao(obs)
+                conexao.send((recompensa, terminado, truncado, info))
+            elif comando == "reset":
+                _, info = ambiente.reset(dado)
+                ambiente.observacao(obs)
+                conexao.send(info)
+            elif comando == "fechar":
+                break
+    finally:
+        del obs
+        memoria.close()
+        conexao.close()
+
+
+class AmbienteVetorizado:
+    # N partidas independentes, uma por processo, andando juntas. As observações saem em lote
+    # (num_ambientes, TAMANHO_OBS) de um bloco de memória compartilhada, sem serializar arrays.
+    def __init__(self, num_ambientes, **kwargs):
+        self.num_ambientes = num_ambientes
+        contexto = get_context("spawn")
+        self.memoria = SharedMemory(create=True, size=num_ambientes * TAMANHO_OBS * 4)
+        self.obs = np.ndarray((num_ambientes, TAMANHO_OBS), dtype=np.float32, buffer=self.memoria.buf)
+        self.conexoes = []
+        self.processos = []
+        for i in range(num_ambientes):
+            local, remota = contexto.Pipe()
+            processo = contexto.Process(target=_trabalhador, args=(remota, self.memoria.name, i, kwargs), daemon=True)
+            processo.start()
+            remota.close()
+            self.conexoes.append(local)
+            self.processos.append(processo)
+
+    def reset(self, seed=None):
+        # Com seed, o ambiente i recebe seed + i
+        for i, conexao in enumerate(self.conexoes):
+            conexao.send(("reset", None if seed is None else seed + i))
+        infos = [conexao.recv() for conexao in self.conexoes]
+        return self.obs.copy(), infos
+
+    def step(self, acoes):
+        for conexao, acao in zip(self.conexoes, acoes):
+            conexao.send(("step", int(acao)))
+        resultados = [conexao.recv() for conexao in self.conexoes]
+        recompensas, terminados, truncados, infos = zip(*resultados)
+        return (self.obs.copy(), np.array(recompensas, dtype=np.float32),
+                np.array(terminados), np.array(truncados), list(infos))
+
+    def close(self):
+        for conexao in self.conexoes:
+            try:
+                conexao.send(("fechar", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for processo in self.processos:
+            processo.join(timeout=5)
+        del self.obs
+        self.memoria.close()
+        self.memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.close()
+
+
+def medir_vazao(num_ambientes, passos, passos_por_acao=1):
+    rng = np.random.default_rng(0)
+    with AmbienteVetorizado(num_ambientes, passos_por_acao=passos_por_acao) as ambientes:
+        ambientes.reset(seed=0)
+        inicio = time.perf_counter()
+        for _ in range(passos):
+            ambientes.step(rng.integers(0, NUM_ACOES, num_ambientes))
+        duracao = time.perf_counter() - inicio
+    return num_ambientes * passos / duracao
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Mede passos/s do ambiente vetorizado com ações aleatórias")
+    parser.add_argument("--ambientes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--passos", type=int, default=2000)
+    parser.add_argument("--passos-por-acao", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'ambientes':>9} {'passos/s':>10} {'por ambiente':>13}")
+    for n in sorted(set(args.ambientes)):
+        vazao = medir_vazao(n, args.passos, args.passos_por_acao)
+        print(f"{n:>9} {vazao:>10.0f} {vazao / n:>13.0f}")
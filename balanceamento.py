@@ -0,0 +1,186 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from multiprocessing import get_context
+
+import pygame
+
+import main
+
+# Bits das máscaras de main.TECLAS_POR_MASCARA
+W, A, S, D, ESPACO = 1, 2, 4, 8, 16
+
+ESTADOS_EM_JOGO = ("NORMAL", "BOSS", "BOSS_INCOMING")
+ESTADOS_CHEFAO = ("BOSS_INCOMING", "BOSS", "WIN")
+
+
+# Robôs de teste: recebem o tick e devolvem a máscara de teclas daquele tick
+def politica_parado(tick):
+    return ESPACO
+
+
+def politica_varredura(tick):
+    return ESPACO | (A if tick % 240 < 120 else D)
+
+
+def politica_esquiva(tick):
+    # Atira sempre e foge na horizontal da ameaça mais próxima que esteja descendo na sua direção
+    jogador = main.jogador.rect
+    ameacas = [s.rect for s in main.tiros_chefao]
+    if not main.jogador.transformado:
+        ameacas += [s.rect for s in main.inimigos]
+    perto = [r for r in ameacas
+             if jogador.top - 220 < r.bottom < jogador.bottom and abs(r.centerx - jogador.centerx) < 70]
+    if not perto:
+        return ESPACO | (A if jogador.centerx > main.LARGURA // 2 + 40 else D if jogador.centerx < main.LARGURA // 2 - 40 else 0)
+    ameaca = max(perto, key=lambda r: r.bottom)
+    if ameaca.centerx > jogador.centerx:
+        return ESPACO | (A if jogador.left > 0 else D)
+    return ESPACO | (D if jogador.right < main.LARGURA else A)
+
+
+POLITICAS = {
+    'parado': politica_parado,
+    'varredura': politica_varredura,
+    'esquiva': politica_esquiva,
+}
+
+
+def preparar_processo(ondas):
+    if ondas:
+        main.agendador.carregar(ondas)
+
+
+def jogar_partida(tarefa):
+    # Roda uma partida inteira num processo do pool com as constantes de balanceamento da configuração
+    indice, parametros, politica, semente, max_ticks = tarefa
+    for nome, valor in parametros.items():
+        setattr(main, nome, valor)
+    main.iniciar_partida(semente)
+    escolher = POLITICAS[politica]
+    teclas = main.TECLAS_POR_MASCARA
+
+    chegou_chefao = False
+    tick = 0
+    while tick < max_ticks and main.estado_jogo in ESTADOS_EM_JOGO:
+        main.atualizar_simulacao(teclas[escolher(tick)])
+        # GAME_OVER também sai de NORMAL: só os estados do chefão contam
+        chegou_chefao = chegou_chefao or main.estado_jogo in ESTADOS_CHEFAO
+        tick += 1
+
+    return indice, politica, {
+        'sobrevivencia': tick,
+        'pontos': main.pontos,
+        'chegou_chefao': chegou_chefao,
+        'venceu': main.estado_jogo == "WIN",
+        'morreu': main.estado_jogo == "GAME_OVER",
+    }
+
+
+def lista_de_numeros(texto):
+    return tuple(float(v) if '.' in v else int(v) for v in texto.split(','))
+
+
+def montar_configuracoes(args):
+    eixos = {
+        'FAIXAS_SPAWN': args.faixas_spawn,
+        'INTERVALO_SPAWN': args.intervalo_spawn,
+        'CHANCE_POWERUP': args.chance_powerup,
+        'CHANCE_DROP': args.chance_drop,
+        'VIDA_CHEFAO': args.vida_chefao,
+        'RAJADA_CHEFAO': args.rajada_chefao,
+    }
+    nomes = list(eixos)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(eixos[n] for n in nomes))]
+
+
+def agregar(resultados, configuracoes):
+    linhas = []
+    for (indice, politica), partidas in sorted(resultados.items()):
+        n = len(partidas)
+        linhas.append({
+            **{nome.lower(): valor for nome, valor in configuracoes[indice].items()},
+            'politica': politica,
+            'partidas': n,
+            'sobrevivencia_s': sum(p['sobrevivencia'] for p in partidas) / n / main.TICKS_POR_SEGUNDO,
+            'pontos': sum(p['pontos'] for p in partidas) / n,
+            'chegou_chefao': sum(p['chegou_chefao'] for p in partidas) / n,
+            'venceu_chefao': sum(p['venceu'] for p in partidas) / n,
+            'morreu': sum(p['morreu'] for p in partidas) / n,
+        })
+    return linhas
+
+
+def formatar_valor(valor):
+    if isinstance(valor, tuple):
+        return ",".join(str(v) for v in valor)
+    if isinstance(valor, float):
+        return f"{valor:.3g}"
+    return str(valor)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varre constantes de balanceamento com partidas simuladas em paralelo")
+    parser.add_argument("--faixas-spawn", type=lista_de_numeros, nargs="+", default=[main.FAIXAS_SPAWN],
+                        help="faixas acumuladas separadas por vírgula, ex.: 0.15,0.30,0.45,0.60,0.75")
+    parser.add_argument("--intervalo-spawn", type=int, nargs="+", default=[main.INTERVALO_SPAWN])
+    parser.add_argument("--chance-powerup", type=float, nargs="+", default=[main.CHANCE_POWERUP])
+    parser.add_argument("--chance-drop", type=float, nargs="+", default=[main.CHANCE_DROP])
+    parser.add_argument("--vida-chefao", type=int, nargs="+", default=[main.VIDA_CHEFAO])
+    parser.add_argument("--rajada-chefao", type=lista_de_numeros, nargs="+", default=[main.RAJADA_CHEFAO],
+                        help="começa,intervalo,último tiro,reinício, ex.: 45,10,65,70")
+    parser.add_argument("--ondas", metavar="ARQUIVO",
+                        help="ondas de robôs em JSON; com elas, --faixas-spawn e --intervalo-spawn não têm efeito")
+    parser.add_argument("--politicas", nargs="+", choices=list(POLITICAS), default=list(POLITICAS))
+    parser.add_argument("--partidas", type=int, default=20, help="partidas por configuração e política")
+    parser.add_argument("--max-ticks", type=int, default=main.TICKS_POR_SEGUNDO * 60 * 5)
+    parser.add_argument("--semente", type=int, default=0, help="a partida i usa semente + i em toda configuração")
+    parser.add_argument("--processos", type=int, default=os.cpu_count())
+    parser.add_argument("--csv", metavar="ARQUIVO", help="grava a tabela de resultados em CSV")
+    args = parser.parse_args()
+    for faixas in args.faixas_spawn:
+        # Limites acumulados das cinco primeiras classes; o que sobra até 1.0 é do zigue-zague
+        if (len(faixas) != len(main.FAIXAS_SPAWN)
+                or not all(a < b for a, b in zip((0,) + faixas, faixas + (1,)))):
+            parser.error(f"--faixas-spawn {formatar_valor(faixas)}: precisa de {len(main.FAIXAS_SPAWN)} valores "
+                         "estritamente crescentes entre 0 e 1")
+    if args.ondas:
+        # Valida o arquivo aqui, antes de cada processo do pool tropeçar no mesmo erro
+        try:
+            main.agendador.carregar(args.ondas)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    configuracoes = montar_configuracoes(args)
+    tarefas = [(i, parametros, politica, args.semente + p, args.max_ticks)
+               for i, parametros in enumerate(configuracoes)
+               for politica in args.politicas
+               for p in range(args.partidas)]
+
+    resultados = {}
+    inicio = time.perf_counter()
+    with get_context("spawn").Pool(args.processos, preparar_processo, (args.ondas,)) as pool:
+        for feitas, (indice, politica, partida) in enumerate(
+                pool.imap_unordered(jogar_partida, tarefas, chunksize=max(1, len(tarefas) // (args.processos * 8))), 1):
+            resultados.setdefault((indice, politica), []).append(partida)
+            print(f"\r{feitas}/{len(tarefas)} partidas", end="", file=sys.stderr)
+    print(f"\r{len(tarefas)} partidas em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+    linhas = agregar(resultados, configuracoes)
+    colunas = list(linhas[0])
+    larguras = [max(len(c), *(len(formatar_valor(l[c])) for l in linhas)) for c in colunas]
+    print("  ".join(c.rjust(w) for c, w in zip(colunas, larguras)))
+    for linha in linhas:
+        print("  ".join(formatar_valor(linha[c]).rjust(w) for c, w in zip(colunas, larguras)))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            for linha in linhas:
+                escritor.writerow([formatar_valor(linha[c]) for c in colunas])
+
+    pygame.quit()
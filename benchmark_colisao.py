@@ -0,0 +1,53 @@
+import random
+import time
+
+import pygame
+
+import main
+
+
+def montar_cena(n_inimigos, n_tiros, semente=0):
+    rng = random.Random(semente)
+    inimigos = pygame.sprite.Group()
+    tiros = pygame.sprite.Group()
+    for _ in range(n_inimigos):
+        inimigos.add(main.RoboLento(rng.randint(0, main.LARGURA), rng.randint(0, main.ALTURA)))
+    for _ in range(n_tiros):
+        tiros.add(main.Tiro(rng.randint(0, main.LARGURA), rng.randint(0, main.ALTURA)))
+    return inimigos, tiros
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def comparar(n_inimigos, n_tiros, repeticoes=50):
+    inimigos, tiros = montar_cena(n_inimigos, n_tiros)
+    grade = main.GradeEspacial()
+
+    def com_groupcollide():
+        pygame.sprite.groupcollide(inimigos, tiros, False, False)
+
+    def com_grade():
+        grade.reconstruir(inimigos, tiros)
+        grade.colisoes_grupos(inimigos, tiros, False, False)
+
+    esperado = {k: set(v) for k, v in pygame.sprite.groupcollide(inimigos, tiros, False, False).items()}
+    grade.reconstruir(inimigos, tiros)
+    obtido = {k: set(v) for k, v in grade.colisoes_grupos(inimigos, tiros, False, False).items()}
+    assert esperado == obtido, "a grade deve encontrar exatamente as mesmas colisões"
+
+    caminho = "grade" if grade.usa_grade(tiros) else "groupcollide"
+    return medir(com_groupcollide, repeticoes), medir(com_grade, repeticoes), caminho
+
+
+if __name__ == "__main__":
+    # caminho: o que GradeEspacial usou de fato (sem grade, abaixo de minimo_sprites, é o próprio groupcollide)
+    print(f"{'inimigos':>9} {'tiros':>6} {'groupcollide (ms)':>18} {'grade (ms)':>11} {'ganho':>6}  caminho")
+    for n_inimigos, n_tiros in [(20, 20), (30, 40), (50, 100), (100, 200), (200, 400), (400, 800), (800, 1600)]:
+        t_group, t_grade, caminho = comparar(n_inimigos, n_tiros)
+        print(f"{n_inimigos:>9} {n_tiros:>6} {t_group:>18.3f} {t_grade:>11.3f} {t_group / t_grade:>5.1f}x  {caminho}")
+    pygame.quit()
@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pygame
+
+import main
+
+try:
+    import resource
+    RESOURCE_OK = True
+except ImportError:
+    RESOURCE_OK = False
+
+K = pygame
+
+
+def vai_e_volta(tick, periodo=240):
+    return K.K_a if tick % periodo < periodo // 2 else K.K_d
+
+
+def manter_vivo():
+    # Os cenários medem a simulação, não a partida: o jogador nunca chega a GAME_OVER
+    main.jogador.vida = max(main.jogador.vida, 1000)
+
+
+def manter_sem_chefao():
+    main.pontos = min(main.pontos, 49)
+
+
+# Cada cenário parte de uma partida nova (semeada) e só ajusta o estado do jogo; spawn, colisões,
+# movimento e descarte são os de atualizar_simulacao, os mesmos que rodam no jogo.
+class Cenario:
+    def preparar(self):
+        manter_vivo()
+
+    def manter(self, tick):
+        manter_vivo()
+        manter_sem_chefao()
+
+    def entrada(self, tick):
+        return main.SEM_TECLAS
+
+
+class Ocioso(Cenario):
+    pass
+
+
+class TiroTriplo(Cenario):
+    def manter(self, tick):
+        super().manter(tick)
+        main.tempo_tirotriplo = main.TICKS_POR_SEGUNDO * 5
+
+    def entrada(self, tick):
+        return main.TeclasSimuladas([K.K_SPACE, vai_e_volta(tick)])
+
+
+class CacadorTransformado(Cenario):
+    # Transformado, o jogador atira em dobro e vai atrás do robô mais próximo
+    def manter(self, tick):
+        super().manter(tick)
+        main.jogador.ativar_transformacao()
+
+    def entrada(self, tick):
+        alvo = min(main.inimigos, key=lambda r: abs(r.rect.centerx - main.jogador.rect.centerx), default=None)
+        if alvo is None or abs(alvo.rect.centerx - main.jogador.rect.centerx) < main.jogador.velocidade:
+            return main.TeclasSimuladas([K.K_SPACE])
+        return main.TeclasSimuladas([K.K_SPACE, K.K_d if alvo.rect.centerx > main.jogador.rect.centerx else K.K_a])
+
+
+class LutaChefao(Cenario):
+    # O chefão nunca morre, então todas as rajadas de BossTiro saem durante o cenário inteiro
+    def preparar(self):
+        manter_vivo()
+        main.pontos = 50
+
+    def manter(self, tick):
+        manter_vivo()
+        main.tempo_tirotriplo = main.TICKS_POR_SEGUNDO * 5
+        if main.chefao is not None:
+            main.chefao.vida = main.VIDA_CHEFAO
+
+    def entrada(self, tick):
+        return main.TeclasSimuladas([K.K_SPACE, vai_e_volta(tick, 180)])
+
+
+class Enxame(Cenario):
+    # Mantém N robôs vivos, sorteados com a mesma mistura de classes do spawn normal
+    def __init__(self, quantidade=500):
+        self.quantidade = quantidade
+
+    def preparar(self):
+        manter_vivo()
+        main.descarte.limites = [(g, max(l, self.quantidade) if g is main.inimigos else l)
+                                 for g, l in main.descarte.limites]
+        for _ in range(self.quantidade):
+            main.cena.adicionar(main.sortear_robo(main.rng.randint(-50, main.ALTURA - 100)), main.inimigos)
+
+    def manter(self, tick):
+        super().manter(tick)
+        for _ in range(self.quantidade - len(main.inimigos)):
+            main.cena.adicionar(main.sortear_robo(), main.inimigos)
+
+    def entrada(self, tick):
+        return main.TeclasSimuladas([K.K_SPACE, vai_e_volta(tick)])
+
+
+CENARIOS = {
+    'ocioso': Ocioso,
+    'tiro_triplo': TiroTriplo,
+    'cacador_transformado': CacadorTransformado,
+    'chefao': LutaChefao,
+    'enxame_500': Enxame,
+}
+
+
+def pico_rss_mb():
+    if not RESOURCE_OK:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def rodar_cenario(nome, ticks, semente):
+    cenario = CENARIOS[nome]()
+    main.iniciar_partida(semente)
+    cenario.preparar()
+
+    tempos = []
+    inicio = time.perf_counter()
+    for tick in range(ticks):
+        cenario.manter(tick)
+        keys = cenario.entrada(tick)
+        antes = time.perf_counter()
+        main.atualizar_simulacao(keys)
+        tempos.append(time.perf_counter() - antes)
+    duracao = time.perf_counter() - inicio
+
+    return {
+        'ticks_por_segundo': ticks / sum(tempos),
+        'media_ms': sum(tempos) / ticks * 1000,
+        'p99_ms': main.Perfilador.p99(tempos) * 1000,
+        'pico_rss_mb': pico_rss_mb(),
+        'duracao_s': duracao,
+        'inimigos_no_fim': len(main.inimigos),
+    }
+
+
+def rodar_isolado(nome, ticks, semente):
+    # Processo novo por cenário: o pico de RSS é do cenário e o estado global do jogo não vaza
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(rodar_cenario, nome, ticks, semente).result()
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(resultados, base, tolerancia):
+    # Regressão: ticks/s caiu ou o p99 subiu mais que a tolerância em relação à base
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = base['cenarios'].get(nome)
+        if anterior is None:
+            continue
+        if atual['ticks_por_segundo'] < anterior['ticks_por_segundo'] * (1 - tolerancia):
+            regressoes.append(f"{nome}: ticks/s {anterior['ticks_por_segundo']:.0f} -> {atual['ticks_por_segundo']:.0f}")
+        if atual['p99_ms'] > anterior['p99_ms'] * (1 + tolerancia):
+            regressoes.append(f"{nome}: p99 {anterior['p99_ms']:.3f} ms -> {atual['p99_ms']:.3f} ms")
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da simulação com entradas roteirizadas")
+    parser.add_argument("cenarios", nargs="*", metavar="CENARIO",
+                        help=f"cenários a rodar: {', '.join(CENARIOS)} (padrão: todos)")
+    parser.add_argument("--ticks", type=int, default=main.TICKS_POR_SEGUNDO * 60)
+    parser.add_argument("--repeticoes", type=int, default=3, help="rodadas por cenário; vale a mediana de ticks/s")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--numpy", action="store_true", help="usa o armazém vetorizado")
+    parser.add_argument("--salvar", metavar="ARQUIVO", help="grava os resultados em JSON para comparar depois")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="compara com um JSON salvo e acusa regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    args = parser.parse_args()
+    for nome in args.cenarios:
+        if nome not in CENARIOS:
+            parser.error(f"cenário desconhecido: {nome}")
+
+    if args.numpy:
+        os.environ["ROBOT_DEFENSE_NUMPY"] = "1"
+
+    resultados = {}
+    print(f"{'cenário':<22} {'ticks/s':>9} {'média (ms)':>11} {'p99 (ms)':>9} {'pico RSS (MB)':>14}")
+    for nome in args.cenarios or list(CENARIOS):
+        rodadas = sorted((rodar_isolado(nome, args.ticks, args.semente) for _ in range(args.repeticoes)),
+                         key=lambda r: r['ticks_por_segundo'])
+        r = resultados[nome] = rodadas[len(rodadas) // 2]
+        rss = f"{r['pico_rss_mb']:.1f}" if r['pico_rss_mb'] is not None else "-"
+        print(f"{nome:<22} {r['ticks_por_segundo']:>9.0f} {r['media_ms']:>11.3f} {r['p99_ms']:>9.3f} {rss:>14}")
+
+    if args.salvar:
+        with open(args.salvar, 'w') as arquivo:
+            json.dump({
+                'commit': commit_atual(),
+                'python': platform.python_version(),
+                'pygame': pygame.version.ver,
+                'numpy': args.numpy,
+                'ticks': args.ticks,
+                'semente': args.semente,
+                'cenarios': resultados,
+            }, arquivo, indent=2)
+
+    codigo = 0
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            base = json.load(arquivo)
+        if (base.get('ticks'), base.get('semente'), base.get('numpy')) != (args.ticks, args.semente, args.numpy):
+            print("Aviso: a base foi medida com outros --ticks/--semente/--numpy; a comparação vale pouco")
+        regressoes = comparar(resultados, base, args.tolerancia)
+        if regressoes:
+            print(f"Regressões em relação a {base.get('commit') or args.comparar}:")
+            for linha in regressoes:
+                print("  " + linha)
+            codigo = 1
+        else:
+            print(f"Sem regressões em relação a {base.get('commit') or args.comparar}")
+
+    pygame.quit()
+    sys.exit(codigo)
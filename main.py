@@ -3,12 +3,72 @@ import random
 import math
 import os
 import sys
-
-try:
-    import cv2
-    OPENCV_OK = True
-except Exception:
-    OPENCV_OK = False
+import csv
+import struct
+import time
+import json
+import bisect
+import contextlib
+import itertools
+import functools
+import hashlib
+import importlib
+import io
+import importlib.util
+import atexit
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+class RegistroRecursos:
+    # Módulos opcionais pesados, importados só quando o recurso que precisa deles é usado.
+    # disponivel() procura o módulo sem importar; carregar() importa, publica o módulo no
+    # global indicado (cv2, np) e anota o custo para o relatório de --relatorio-inicio.
+    def __init__(self):
+        self.recursos = {}
+        self.carregados = {}
+        self.custos = {}
+
+    def registrar(self, nome, modulo, apelido):
+        self.recursos[nome] = (modulo, apelido)
+
+    def disponivel(self, nome):
+        if nome in self.carregados:
+            return self.carregados[nome] is not None
+        try:
+            return importlib.util.find_spec(self.recursos[nome][0]) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def carregar(self, nome):
+        if nome in self.carregados:
+            return self.carregados[nome]
+        modulo, apelido = self.recursos[nome]
+        modulos_antes = len(sys.modules)
+        inicio = time.perf_counter()
+        try:
+            carregado = importlib.import_module(modulo)
+        except Exception:
+            carregado = None
+        self.custos[nome] = ((time.perf_counter() - inicio) * 1000, len(sys.modules) - modulos_antes)
+        self.carregados[nome] = carregado
+        globals()[apelido] = carregado
+        return carregado
+
+cv2 = None
+np = None
+recursos = RegistroRecursos()
+recursos.registrar('video', 'cv2', 'cv2')
+recursos.registrar('numpy', 'numpy', 'np')
+
+# Sem janela: usado quando o módulo é importado (simulação, ferramentas) ou com --headless
+HEADLESS = os.environ.get("ROBOT_DEFENSE_HEADLESS", "0" if __name__ == "__main__" else "1") == "1" or any(opcao in sys.argv for opcao in ("--headless", "--replay", "--gerar-cache-assets", "--relatorio-inicio"))
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # Sem isso o SDL captura SIGTERM e processos de simulação em pool não podem ser encerrados
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
 
 pygame.init()
 
@@ -20,6 +80,36 @@ pygame.display.set_caption("Power Rangers: Robot Defense")
 FPS = 60
 clock = pygame.time.Clock()
 
+# A simulação anda em passos fixos, independentes do FPS de desenho: todos os tempos e
+# velocidades do jogo são contados em ticks de TICKS_POR_SEGUNDO.
+TICKS_POR_SEGUNDO = 60
+PASSO_SIMULACAO = 1.0 / TICKS_POR_SEGUNDO
+MAX_PASSOS_POR_QUADRO = 5
+
+# Todo sorteio da partida sai deste gerador, semeado em reset_game_state, para que uma
+# partida possa ser reproduzida tick a tick a partir da semente e das teclas gravadas
+rng = random.Random()
+semente_partida = 0
+
+# Constantes de balanceamento (ajustadas com balanceamento.py)
+# Faixas acumuladas do sorteio de robôs: caçador, circular, pulante, rápido, lento; o resto é zigue-zague
+FAIXAS_SPAWN = (0.15, 0.30, 0.45, 0.60, 0.75)
+INTERVALO_SPAWN = 60
+CHANCE_POWERUP = 0.005
+CHANCE_DROP = 0.10
+VIDA_CHEFAO = 100
+# Rajada do chefão, em ticks do contador dele: começa, intervalo entre tiros, último tiro, reinício
+RAJADA_CHEFAO = (45, 10, 65, 70)
+
+# Fontes e textos renderizados ficam em cache: SysFont e render() custam caro para refazer a cada frame
+@functools.lru_cache(maxsize=None)
+def obter_fonte(tamanho, bold=False):
+    return pygame.font.SysFont(None, tamanho, bold=bold)
+
+@functools.lru_cache(maxsize=256)
+def render_texto(texto, cor, tamanho, bold=False):
+    return obter_fonte(tamanho, bold).render(texto, True, cor)
+
 SPRITES_DIR = 'sprites'
 AUDIOS_DIR = 'audios'
 
@@ -33,55 +123,504 @@ pygame.mixer.init()
 audios = {}
 music_status = True
 
+class GerenciadorAssets:
+    # Decodifica imagens e sons numa pool de threads (pygame.image.load e mixer.Sound soltam o GIL
+    # enquanto leem e decodificam). Cada asset é registrado com a função que o decodifica; os
+    # críticos começam logo, os outros só quando alguém pede (antecipar/obter). Converter e escalar
+    # continua na thread principal, por quem chama obter.
+    def __init__(self, trabalhadores=4):
+        self.executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='assets')
+        self.receitas = {}
+        self.futuros = {}
+        self.criticos = []
+
+    def registrar(self, chave, decodificar, critico=True):
+        self.receitas[chave] = decodificar
+        if critico:
+            self.criticos.append(chave)
+            self.antecipar(chave)
+
+    def antecipar(self, *chaves):
+        for chave in chaves:
+            if chave not in self.futuros:
+                self.futuros[chave] = self.executor.submit(self.receitas[chave], chave)
+
+    def obter(self, chave):
+        # Espera a decodificação (começa agora se ninguém pediu antes). Erros de leitura sobem
+        # para quem chamou, que já tem o seu fallback.
+        self.antecipar(chave)
+        return self.futuros.pop(chave).result()
+
+    def tela_de_carregamento(self):
+        # Mostra o progresso dos assets críticos em vez de uma janela preta
+        if HEADLESS:
+            return
+        total = len(self.criticos)
+        barra = pygame.Rect(LARGURA // 4, ALTURA // 2, LARGURA // 2, 16)
+        while True:
+            prontos = sum(1 for chave in self.criticos if chave not in self.futuros or self.futuros[chave].done())
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+
+            TELA.fill((0, 0, 0))
+            texto = render_texto("Carregando...", (255, 255, 255), 36)
+            TELA.blit(texto, (LARGURA // 2 - texto.get_width() // 2, barra.y - 50))
+            pygame.draw.rect(TELA, (255, 255, 255), barra, 2)
+            pygame.draw.rect(TELA, (255, 215, 0), (barra.x + 3, barra.y + 3, (barra.width - 6) * prontos // max(total, 1), barra.height - 6))
+            pygame.display.flip()
+
+            if prontos == total:
+                return
+            clock.tick(FPS)
+
+assets = GerenciadorAssets()
+
+class CacheAssets:
+    # Pixels já escalados e convertidos, num único arquivo lido de uma vez só:
+    #   'RDAC' | versão u8 | tamanho do índice u32 | índice JSON | blocos de pixels crus
+    # Cada entrada lembra o arquivo de origem; ela vale enquanto mtime e tamanho da origem
+    # baterem ou, se mudaram, enquanto o hash do conteúdo continuar o mesmo.
+    MAGICO = b'RDAC'
+    VERSAO = 1
+    CABECALHO = struct.Struct('<4sBI')
+
+    def __init__(self, caminho, ativo=True):
+        self.caminho = caminho
+        self.ativo = ativo
+        self.fontes = {}
+        self.entradas = {}
+        self.dados = b''
+        self.novos = {}
+        self.sujo = False
+        if ativo:
+            self.abrir()
+
+    def abrir(self):
+        try:
+            with open(self.caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+            magico, versao, tamanho_indice = self.CABECALHO.unpack_from(conteudo)
+            if magico != self.MAGICO or versao != self.VERSAO:
+                return
+            inicio = self.CABECALHO.size
+            indice = json.loads(conteudo[inicio:inicio + tamanho_indice])
+        except (OSError, ValueError, struct.error):
+            return
+        self.fontes = indice['fontes']
+        self.entradas = indice['entradas']
+        self.dados = memoryview(conteudo)[inicio + tamanho_indice:]
+
+    @staticmethod
+    def assinatura(caminho):
+        estado = os.stat(caminho)
+        return estado.st_mtime_ns, estado.st_size
+
+    @staticmethod
+    def hash_arquivo(caminho):
+        with open(caminho, 'rb') as arquivo:
+            return hashlib.blake2b(arquivo.read(), digest_size=16).hexdigest()
+
+    def fonte_valida(self, caminho):
+        fonte = self.fontes.get(caminho)
+        if not self.ativo or fonte is None:
+            return False
+        try:
+            mtime, tamanho = self.assinatura(caminho)
+            if (mtime, tamanho) == (fonte['mtime'], fonte['tamanho']):
+                return True
+            if tamanho == fonte['tamanho'] and self.hash_arquivo(caminho) == fonte['hash']:
+                fonte['mtime'] = mtime
+                self.sujo = True
+                return True
+        except OSError:
+            pass
+        del self.fontes[caminho]
+        self.sujo = True
+        return False
+
+    def tem(self, chave):
+        entrada = self.entradas.get(chave)
+        return entrada is not None and self.fonte_valida(entrada['fonte'])
+
+    def carregar(self, chave):
+        if not self.tem(chave):
+            return None
+        entrada = self.entradas[chave]
+        superficie = pygame.image.frombuffer(self.dados[entrada['inicio']:entrada['fim']],
+                                             (entrada['w'], entrada['h']), entrada['modo'])
+        # convert copia os pixels para o formato da tela; o buffer lido não fica preso à superfície
+        return superficie.convert_alpha() if entrada['modo'] == 'RGBA' else superficie.convert()
+
+    def guardar(self, chave, caminho_fonte, superficie, alpha=True):
+        if not self.ativo:
+            return
+        try:
+            mtime, tamanho = self.assinatura(caminho_fonte)
+            self.fontes[caminho_fonte] = {'mtime': mtime, 'tamanho': tamanho, 'hash': self.hash_arquivo(caminho_fonte)}
+        except OSError:
+            return
+        modo = 'RGBA' if alpha else 'RGB'
+        self.novos[chave] = (caminho_fonte, superficie.get_size(), modo, pygame.image.tobytes(superficie, modo))
+        self.sujo = True
+
+    def salvar(self):
+        if not self.ativo or not self.sujo:
+            return
+        indice = {'fontes': {}, 'entradas': {}}
+        blocos = []
+        posicao = 0
+
+        def incluir(chave, fonte, tamanho, modo, pixels):
+            nonlocal posicao
+            indice['entradas'][chave] = {'fonte': fonte, 'w': tamanho[0], 'h': tamanho[1], 'modo': modo,
+                                         'inicio': posicao, 'fim': posicao + len(pixels)}
+            indice['fontes'][fonte] = self.fontes[fonte]
+            blocos.append(pixels)
+            posicao += len(pixels)
+
+        for chave, entrada in self.entradas.items():
+            if chave not in self.novos and entrada['fonte'] in self.fontes:
+                incluir(chave, entrada['fonte'], (entrada['w'], entrada['h']), entrada['modo'],
+                        self.dados[entrada['inicio']:entrada['fim']])
+        for chave, (fonte, tamanho, modo, pixels) in self.novos.items():
+            incluir(chave, fonte, tamanho, modo, pixels)
+
+        texto_indice = json.dumps(indice).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            temporario = f"{self.caminho}.{os.getpid()}.tmp"
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(self.CABECALHO.pack(self.MAGICO, self.VERSAO, len(texto_indice)))
+                arquivo.write(texto_indice)
+                for bloco in blocos:
+                    arquivo.write(bloco)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            print(f"AVISO: não foi possível gravar o cache de assets: {e}")
+            return
+        self.sujo = False
+
+    def via_cache(self, chave, caminho_fonte, gerar, alpha=True):
+        # Superfície pronta do cache ou, se não houver, gerada (decodificar + escalar) e guardada
+        superficie = self.carregar(chave)
+        if superficie is None:
+            superficie = gerar()
+            self.guardar(chave, caminho_fonte, superficie, alpha)
+        return superficie
+
+# Desligado com ROBOT_DEFENSE_CACHE_ASSETS=0 ou --sem-cache-assets
+cache_assets = CacheAssets(os.path.join('.cache_assets', 'sprites.bin'),
+                           ativo=os.environ.get("ROBOT_DEFENSE_CACHE_ASSETS", "1") == "1" and "--sem-cache-assets" not in sys.argv)
+atexit.register(cache_assets.salvar)
+
+SFX = {
+    'chegada_chefao': 'chegada_chefao.wav',
+    'clique_botao': 'clique_botao.wav',
+    'game_over': 'game_over.wav',
+    'morte_chefao': 'morte_chefao.wav',
+    'perca_easter_egg': 'perca_easter_egg.wav',
+    'power_up': 'power_up.wav',
+    'tiro': 'tiro.wav',
+    'transformacao_easter_egg': 'transformacao_easter_egg.wav',
+}
+
+# Vozes de cada efeito: (máximo tocando ao mesmo tempo, prioridade, intervalo mínimo entre
+# disparos em ms). Prioridade PRIORIDADE_RESERVADA pode usar os canais reservados; sem canal
+# livre, um som rouba o canal de outro de prioridade menor, o mais antigo primeiro.
+VOZES_SFX = {
+    'tiro': (4, 0, 35),
+    'perca_easter_egg': (2, 1, 100),
+    'power_up': (2, 1, 0),
+    'clique_botao': (2, 1, 0),
+    'transformacao_easter_egg': (1, 1, 0),
+    'chegada_chefao': (1, 2, 0),
+    'morte_chefao': (1, 2, 0),
+    'game_over': (1, 2, 0),
+}
+VOZES_PADRAO = (2, 1, 0)
+PRIORIDADE_RESERVADA = 2
+CANAIS_SFX = 16
+CANAIS_RESERVADOS = 2
+
+MUSICAS = {
+    'trilha_jogo': 'trilha_sonora_1.mp3',  # Trilha normal
+    'trilha_boss': 'trilha_sonora_3.mp3',  # Trilha do chefão
+}
+# Faixa que costuma vir depois de cada uma: já fica lida na memória enquanto a atual toca
+PROXIMA_MUSICA = {'trilha_jogo': 'trilha_boss'}
+
+# chave em sprites: (arquivo, cor do fallback, largura, altura, crítico). Os não críticos
+# (chefão, arte do pause) são decodificados no primeiro uso ou quando antecipados.
+ASSETS_SPRITES = {
+    'jogador': ('jogador.png', (0, 255, 0), 60, 60, True),
+    'tiro': ('tiro.png', (255, 255, 0), 12, 24, True),
+    'robo_zigue': ('robo_zigue.png', (255, 0, 0), 50, 50, True),
+    'robo_cacador': ('robo_cacador.png', (255, 100, 0), 50, 50, True),
+    'robo_lento': ('robo_lento.png', (100, 0, 255), 50, 50, True),
+    'robo_rapido': ('robo_rapido.png', (0, 100, 255), 50, 50, True),
+    'robo_ciclico': ('robo_ciclico.png', (255, 0, 100), 50, 50, True),
+    'robo_saltador': ('robo_saltador.png', (150, 0, 150), 50, 50, True),
+    'power_vida': ('power_vida.png', (0, 0, 255), 40, 40, True),
+    'power_velocidade': ('power_velocidade.png', (163, 73, 14), 40, 40, True),
+    'power_tirotriplo': ('power_tirotriplo.png', (255, 141, 161), 40, 40, True),
+    'boss': ('boss.png', (0, 0, 150), 150, 150, False),
+    'boss_tiro': ('boss_tiro.png', (0, 0, 255), 25, 35, False),
+    'explosao': ('tentativa.png', (255, 255, 255), 274, 384, True),
+    'pause_button_sprite': ('Botaopause.jpg', (0, 0, 0), 60, 60, True),
+    'menu_pause_fundo': ('Pause.jpg', (0, 0, 100), 40, 40, False),
+}
+
+CAMINHO_FUNDO = os.path.join(SPRITES_DIR, 'fundo.png')
+CAMINHO_TELA_INICIAL = os.path.join(SPRITES_DIR, 'tela_inicial.png')
+CAMINHO_AGRADECIMENTOS = os.path.join(SPRITES_DIR, "Agradecimentos (1).png")
+
+def ler_arquivo(caminho):
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
+for nome_arquivo in SFX.values():
+    assets.registrar(os.path.join(AUDIOS_DIR, nome_arquivo), pygame.mixer.Sound)
+for nome_arquivo in MUSICAS.values():
+    assets.registrar(os.path.join(AUDIOS_DIR, nome_arquivo), ler_arquivo, critico=False)
+# Imagens que já estão no cache de assets não precisam ser decodificadas
+for caminho in (CAMINHO_FUNDO, CAMINHO_TELA_INICIAL):
+    assets.registrar(caminho, pygame.image.load, not cache_assets.fonte_valida(caminho))
+for nome_arquivo, _, _, _, critico in ASSETS_SPRITES.values():
+    caminho = os.path.join(SPRITES_DIR, nome_arquivo)
+    assets.registrar(caminho, pygame.image.load, critico and not cache_assets.fonte_valida(caminho))
+assets.registrar(CAMINHO_AGRADECIMENTOS, pygame.image.load, critico=False)
+
+assets.tela_de_carregamento()
+
 def carregar_audio(nome_arquivo, tipo="sfx"):
     caminho_completo = os.path.join(AUDIOS_DIR, nome_arquivo)
     try:
         if tipo == "sfx":
-            audio = pygame.mixer.Sound(caminho_completo)
+            audio = assets.obter(caminho_completo)
         else:
             audio = caminho_completo
         return audio
-    except pygame.error as e:
+    except (pygame.error, OSError) as e:
         print(f"AVISO: Não foi possível carregar o áudio '{nome_arquivo}'. Erro: {e}")
         return None
 
 def carregar_todos_audios():
     global audios
 
-    audios['chegada_chefao'] = carregar_audio('chegada_chefao.wav', 'sfx')
-    audios['clique_botao'] = carregar_audio('clique_botao.wav', 'sfx')
-    audios['game_over'] = carregar_audio('game_over.wav', 'sfx')
-    audios['morte_chefao'] = carregar_audio('morte_chefao.wav', 'sfx')
-    audios['perca_easter_egg'] = carregar_audio('perca_easter_egg.wav', 'sfx')
-    audios['power_up'] = carregar_audio('power_up.wav', 'sfx')
-    audios['tiro'] = carregar_audio('tiro.wav', 'sfx')
-    audios['transformacao_easter_egg'] = carregar_audio('transformacao_easter_egg.wav', 'sfx')
+    for chave, nome_arquivo in SFX.items():
+        audios[chave] = carregar_audio(nome_arquivo, 'sfx')
     
-    audios['trilha_jogo'] = carregar_audio('trilha_sonora_1.mp3', 'musica') # Trilha normal
-    audios['trilha_boss'] = carregar_audio('trilha_sonora_3.mp3', 'musica') # Trilha do chefão
+    # Músicas tocam por streaming (mixer.music), então só o caminho é guardado
+    for chave, nome_arquivo in MUSICAS.items():
+        audios[chave] = carregar_audio(nome_arquivo, 'musica')
+
+class GerenciadorVozes:
+    # Escolhe o canal de cada efeito em vez de deixar o mixer pegar qualquer um: limita quantas
+    # vozes cada som tem (a mais antiga recomeça quando passa do limite), ignora disparos
+    # seguidos demais e guarda canais para os avisos importantes não se perderem no meio dos tiros.
+    def __init__(self, canais=CANAIS_SFX, reservados=CANAIS_RESERVADOS):
+        pygame.mixer.set_num_channels(canais)
+        pygame.mixer.set_reserved(reservados)
+        self.canais = [pygame.mixer.Channel(i) for i in range(canais)]
+        self.reservados = reservados
+        self.vozes = [None] * canais
+        self.ultimo_disparo = {}
+
+    def canal_livre(self, prioridade):
+        # Um canal parado ou, se não houver, o som mais antigo entre os de menor prioridade
+        # (canal tocando algo que não passou por aqui conta como prioridade -1)
+        inicio = 0 if prioridade >= PRIORIDADE_RESERVADA else self.reservados
+        vitima = None
+        voz_vitima = None
+        for i in range(inicio, len(self.canais)):
+            if not self.canais[i].get_busy():
+                return i
+            voz = self.vozes[i] or (None, -1, 0)
+            if voz[1] < prioridade and (vitima is None or voz[1:] < voz_vitima[1:]):
+                vitima, voz_vitima = i, voz
+        return vitima
+
+    def tocar(self, chave, som):
+        maximo, prioridade, intervalo = VOZES_SFX.get(chave, VOZES_PADRAO)
+        agora = pygame.time.get_ticks()
+        if chave in self.ultimo_disparo and agora - self.ultimo_disparo[chave] < intervalo:
+            return None
+
+        tocando = [i for i, voz in enumerate(self.vozes)
+                   if voz is not None and voz[0] == chave and self.canais[i].get_busy()]
+        if len(tocando) >= maximo:
+            indice = min(tocando, key=lambda i: self.vozes[i][2])
+        else:
+            indice = self.canal_livre(prioridade)
+            if indice is None:
+                return None
+
+        canal = self.canais[indice]
+        canal.play(som)
+        self.vozes[indice] = (chave, prioridade, agora)
+        self.ultimo_disparo[chave] = agora
+        return canal
 
 def play_sfx(key):
     global music_status
     if music_status and audios.get(key) and isinstance(audios[key], pygame.mixer.Sound):
-        audios[key].play()
-
-def play_music(key, loops=-1):
-    global music_status
-    caminho = audios.get(key)
-    if music_status and caminho and isinstance(caminho, str) and os.path.exists(caminho):
+        vozes.tocar(key, audios[key])
+
+class ControladorMusica:
+    # Uma faixa por vez no mixer.music. Pausar e retomar mantêm a posição da faixa. Trocar de
+    # faixa não trava o quadro: atualizar() abaixa o volume aos poucos e, no fim do fade-out,
+    # abre a próxima a partir dos bytes já lidos pelo pool de assets e a faz entrar com fade-in.
+    def __init__(self, volume=1.0):
+        self.volume = volume
+        self.atual = None
+        self.pausada = False
+        self.proxima = None
+        self.inicio_fade = 0
+        self.duracao_fade = 0
+        self.dados = {}
+        self.arquivo = None
+
+    def antecipar(self, *chaves):
+        for chave in chaves:
+            caminho = audios.get(chave)
+            if chave not in self.dados and caminho in assets.receitas:
+                assets.antecipar(caminho)
+
+    def abrir(self, chave):
+        caminho = audios.get(chave)
+        if not caminho or not os.path.exists(caminho):
+            return False
+        if chave not in self.dados:
+            try:
+                self.dados[chave] = assets.obter(caminho)
+            except OSError as e:
+                print(f"Erro ao ler música {chave}: {e}")
+                return False
+        # O mixer lê a faixa aos poucos enquanto toca, então o arquivo em memória fica guardado
+        self.arquivo = io.BytesIO(self.dados[chave])
+        pygame.mixer.music.load(self.arquivo, os.path.splitext(caminho)[1][1:])
+        return True
+
+    def iniciar(self, chave, loops, fade_ms=0):
+        self.proxima = None
         try:
-            pygame.mixer.music.load(caminho)
-            pygame.mixer.music.play(loops)
+            if not self.abrir(chave):
+                return
+            pygame.mixer.music.set_volume(self.volume)
+            pygame.mixer.music.play(loops, fade_ms=fade_ms)
         except pygame.error as e:
-            print(f"Erro ao tocar música {key}: {e}")
-        
-def stop_music():
-    pygame.mixer.music.stop()
+            print(f"Erro ao tocar música {chave}: {e}")
+            return
+        self.atual = chave
+        self.pausada = False
+        self.antecipar(PROXIMA_MUSICA.get(chave))
+
+    def tocar(self, chave, loops=-1, fade_ms=0):
+        # A mesma faixa pausada continua de onde parou; outra faixa troca com fade se houver som
+        if not music_status:
+            return
+        if chave == self.atual and self.proxima is None:
+            self.retomar()
+        elif fade_ms and self.atual is not None and not self.pausada:
+            self.proxima = (chave, loops, fade_ms)
+            self.inicio_fade = pygame.time.get_ticks()
+            self.duracao_fade = fade_ms
+        else:
+            self.iniciar(chave, loops)
+
+    def atualizar(self):
+        if self.proxima is None:
+            return
+        progresso = (pygame.time.get_ticks() - self.inicio_fade) / self.duracao_fade
+        if progresso >= 1:
+            self.iniciar(*self.proxima)
+        else:
+            pygame.mixer.music.set_volume(self.volume * (1 - progresso))
+
+    def pausar(self):
+        if self.proxima is not None:
+            self.iniciar(*self.proxima[:2])
+        if self.atual is not None and not self.pausada:
+            pygame.mixer.music.pause()
+            self.pausada = True
+
+    def retomar(self):
+        if self.pausada and music_status:
+            pygame.mixer.music.unpause()
+            self.pausada = False
+
+    def parar(self):
+        pygame.mixer.music.stop()
+        self.atual = None
+        self.pausada = False
+        self.proxima = None
 
 carregar_todos_audios()
+vozes = GerenciadorVozes()
+musica = ControladorMusica()
+
+class DecodificadorVideo(threading.Thread):
+    # Lê, escala e converte os quadros fora da thread do jogo. Os quadros circulam por um número
+    # fixo de buffers RGB: livres -> decodificação -> prontos -> tela -> livres. Com todos os
+    # buffers ocupados a decodificação espera, então a fila nunca cresce além deles.
+    FIM = None
+
+    def __init__(self, cap, tamanho, fps, buffers=4):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.tamanho = tamanho
+        self.fps = fps
+        self.inicio = time.perf_counter()
+        self.livres = queue.Queue()
+        self.prontos = queue.Queue()
+        for _ in range(buffers):
+            self.livres.put(np.empty((tamanho[1], tamanho[0], 3), dtype=np.uint8))
+        self.parar = threading.Event()
+
+    def quadro_devido(self):
+        return (time.perf_counter() - self.inicio) * self.fps
+
+    def buffer_livre(self):
+        while not self.parar.is_set():
+            try:
+                return self.livres.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def run(self):
+        escalado = None
+        indice = 0
+        try:
+            while not self.parar.is_set():
+                # Quadro que já passou da hora: avança o vídeo sem converter nem mandar para a tela
+                if indice + 1 < self.quadro_devido():
+                    if not self.cap.grab():
+                        break
+                    indice += 1
+                    continue
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                destino = self.buffer_livre()
+                if destino is None:
+                    break
+                # Escala primeiro (o vídeo costuma ser maior que a janela) e converte direto no buffer
+                escalado = cv2.resize(frame, self.tamanho, dst=escalado, interpolation=cv2.INTER_LINEAR)
+                cv2.cvtColor(escalado, cv2.COLOR_BGR2RGB, dst=destino)
+                self.prontos.put((indice, destino))
+                indice += 1
+        finally:
+            self.prontos.put(self.FIM)
+
+    def encerrar(self):
+        self.parar.set()
+        self.join(timeout=1.0)
 
 def tocar_video_intro(caminho_video):
-    if not OPENCV_OK:
+    if recursos.carregar('video') is None or recursos.carregar('numpy') is None:
         print("OpenCV não está disponível — pulando intro.")
         return
 
@@ -97,45 +636,123 @@ def tocar_video_intro(caminho_video):
     fps_video = cap.get(cv2.CAP_PROP_FPS) or 30.0
     fps_video = max(15.0, float(fps_video))
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.resize(frame, (LARGURA, ALTURA), interpolation=cv2.INTER_LINEAR)
-
-        surface = pygame.image.frombuffer(frame.tobytes(), (LARGURA, ALTURA), 'RGB')
-
-        TELA.blit(surface, (0, 0))
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                cap.release()
-                return
-            if event.type == pygame.QUIT:
-                cap.release()
-                pygame.quit()
-                sys.exit()
-
-        clock.tick(int(fps_video))
-
-    cap.release()
+    decodificador = DecodificadorVideo(cap, (LARGURA, ALTURA), fps_video)
+    decodificador.start()
+    pendente = None
+    acabou = False
+    try:
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
+                    return
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+
+            # O relógio manda: mostra o último quadro pronto que já devia estar na tela e devolve
+            # os anteriores sem desenhar, em vez de atrasar o vídeo inteiro
+            devido = decodificador.quadro_devido()
+            atual = None
+            while not acabou:
+                if pendente is None:
+                    try:
+                        pendente = decodificador.prontos.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pendente is DecodificadorVideo.FIM:
+                        acabou = True
+                        break
+                if pendente[0] > devido:
+                    break
+                if atual is not None:
+                    decodificador.livres.put(atual[1])
+                atual, pendente = pendente, None
+
+            if atual is not None:
+                # frombuffer usa o próprio buffer, sem cópia; depois do blit ele volta para a decodificação
+                TELA.blit(pygame.image.frombuffer(atual[1], (LARGURA, ALTURA), 'RGB'), (0, 0))
+                decodificador.livres.put(atual[1])
+                pygame.display.flip()
+            elif acabou:
+                break
+
+            clock.tick(FPS)
+    finally:
+        decodificador.encerrar()
+        cap.release()
 
 def carregar_fundo(caminho):
     try:
-        img = pygame.image.load(caminho).convert()
-        return pygame.transform.scale(img, (LARGURA, ALTURA))
+        return cache_assets.via_cache(f"{caminho}@{LARGURA}x{ALTURA}", caminho,
+                                      lambda: pygame.transform.scale(assets.obter(caminho).convert(), (LARGURA, ALTURA)),
+                                      alpha=False)
     except Exception:
         print(f"Não foi possível carregar fundo {caminho}, usando fallback colorido.")
         s = pygame.Surface((LARGURA, ALTURA))
         s.fill((20, 20, 20))
         return s
 
-fundo = carregar_fundo(os.path.join(SPRITES_DIR, 'fundo.png'))
-
-def carregar_sprite(nome_arquivo, cor_fallback=(0, 0, 0), largura=40, altura=40):
+fundo = carregar_fundo(CAMINHO_FUNDO)
+
+# Efeitos de tela inteira: (cor, alpha) aplicados sobre o fundo
+TINTA_TRANSFORMADO = ((0, 40, 40), 120)
+TINTA_ESCURECIDA = ((0, 0, 0), 180)
+
+@functools.lru_cache(maxsize=8)
+def fundo_tingido(cor, alpha):
+    # Variante do fundo com a tinta já aplicada, montada uma vez e reaproveitada
+    variante = fundo.copy()
+    overlay = pygame.Surface((LARGURA, ALTURA))
+    overlay.fill(cor)
+    overlay.set_alpha(alpha)
+    variante.blit(overlay, (0, 0))
+    return variante
+
+fundo_tingido(*TINTA_TRANSFORMADO)
+
+# Superfícies derivadas (escaladas, espelhadas, quadros de folha) ficam em cache. São
+# compartilhadas: só blit, nunca desenhar por cima. Cada família tem o seu dicionário, então
+# as chaves não se misturam e dá para limpar uma sem a outra:
+#   variantes_sprite[(asset, tamanho, transformação)] -> superfície
+#   folhas_sprite[(asset, colunas, linhas, tamanho, transformação)] -> tupla de quadros
+# asset é sempre uma chave de sprites (ASSETS_SPRITES), nunca o nome do arquivo.
+TRANSFORMACOES = {
+    'scale': lambda img, tamanho: pygame.transform.scale(img, tamanho),
+    'smoothscale': lambda img, tamanho: pygame.transform.smoothscale(img, tamanho),
+    'flip_x': lambda img, tamanho: pygame.transform.flip(pygame.transform.scale(img, tamanho), True, False),
+}
+variantes_sprite = {}
+folhas_sprite = {}
+
+def variante_sprite(asset, tamanho, transformacao='scale', origem=None):
+    # origem: superfície ou função que a carrega; por padrão sprites[asset]
+    chave = (asset, tuple(tamanho), transformacao)
+    superficie = variantes_sprite.get(chave)
+    if superficie is None:
+        if origem is None:
+            origem = sprites[asset]
+        elif callable(origem):
+            origem = origem()
+        superficie = TRANSFORMACOES[transformacao](origem, chave[1])
+        variantes_sprite[chave] = superficie
+    return superficie
+
+def folha_sprite(asset, colunas, linhas, tamanho, transformacao='scale'):
+    # Fatia uma folha de animação uma única vez; devolve uma tupla de quadros compartilhada
+    chave = (asset, colunas, linhas, tuple(tamanho), transformacao)
+    quadros = folhas_sprite.get(chave)
+    if quadros is None:
+        folha = sprites[asset]
+        w = folha.get_width() // colunas
+        h = folha.get_height() // linhas
+        quadros = tuple(
+            TRANSFORMACOES[transformacao](folha.subsurface((c * w, l * h, w, h)), chave[3])
+            for l in range(linhas) for c in range(colunas)
+        )
+        folhas_sprite[chave] = quadros
+    return quadros
+
+def carregar_sprite(chave, nome_arquivo, cor_fallback=(0, 0, 0), largura=40, altura=40):
     largura_target, altura_target = largura, altura
     
     if 'power_' in nome_arquivo:
@@ -152,19 +769,24 @@ def carregar_sprite(nome_arquivo, cor_fallback=(0, 0, 0), largura=40, altura=40)
         largura_target, altura_target = 60, 60
     
     if nome_arquivo == 'Pause.jpg':
-        try:
-            imagem = pygame.image.load(os.path.join(SPRITES_DIR, nome_arquivo)).convert_alpha()
+        MAX_W = 400
+        caminho_pause = os.path.join(SPRITES_DIR, nome_arquivo)
+
+        def gerar_pause():
+            imagem = assets.obter(caminho_pause).convert_alpha()
             
-            MAX_W = 400
             w_original, h_original = imagem.get_size()
             
             if w_original > MAX_W:
                 ratio = MAX_W / w_original
                 nova_w = MAX_W
                 nova_h = int(h_original * ratio)
-                imagem = pygame.transform.scale(imagem, (nova_w, nova_h))
+                imagem = variante_sprite(chave, (nova_w, nova_h), origem=imagem)
             
             return imagem
+
+        try:
+            return cache_assets.via_cache(f"{caminho_pause}@max{MAX_W}", caminho_pause, gerar_pause)
         except Exception:
             print(f"ATENÇÃO: Não foi possível carregar a sprite {nome_arquivo}. Gerando fallback.")
             surface = pygame.Surface((400, 150), pygame.SRCALPHA)
@@ -173,9 +795,10 @@ def carregar_sprite(nome_arquivo, cor_fallback=(0, 0, 0), largura=40, altura=40)
 
     caminho_completo = os.path.join(SPRITES_DIR, nome_arquivo)
     try:
-        imagem = pygame.image.load(caminho_completo).convert_alpha()
-        imagem = pygame.transform.scale(imagem, (largura_target, altura_target))
-        return imagem
+        return cache_assets.via_cache(
+            f"{caminho_completo}@{largura_target}x{altura_target}", caminho_completo,
+            lambda: variante_sprite(chave, (largura_target, altura_target),
+                                    origem=lambda: assets.obter(caminho_completo).convert_alpha()))
     except Exception:
         print(f"ATENÇÃO: Não foi possível carregar a sprite {caminho_completo}. Gerando fallback.")
         surface = pygame.Surface((largura_target, altura_target), pygame.SRCALPHA)
@@ -187,22 +810,21 @@ def carregar_sprite(nome_arquivo, cor_fallback=(0, 0, 0), largura=40, altura=40)
              surface.fill(cor_fallback)
         return surface
     
-tela_inicial_path = os.path.join(SPRITES_DIR, 'tela_inicial.png')
+tela_inicial_path = CAMINHO_TELA_INICIAL
 try:
     if os.path.exists(tela_inicial_path):
-        tela_inicial_img = pygame.image.load(tela_inicial_path).convert_alpha()
-        tela_inicial_img = pygame.transform.scale(tela_inicial_img, (LARGURA, ALTURA))
+        tela_inicial_img = cache_assets.via_cache(
+            f"{tela_inicial_path}@{LARGURA}x{ALTURA}", tela_inicial_path,
+            lambda: pygame.transform.scale(assets.obter(tela_inicial_path).convert_alpha(), (LARGURA, ALTURA)))
     else:
         raise FileNotFoundError
 except Exception:
     def gerar_tela_inicial_fallback():
         s = pygame.Surface((LARGURA, ALTURA))
         s.fill((20, 160, 100))
-        font_t = pygame.font.SysFont(None, 80)
-        font_s = pygame.font.SysFont(None, 36)
-        titulo = font_t.render("POWER RANGERS", True, (255, 215, 0))
-        subt = font_t.render("ROBOT DEFENSE", True, (255, 255, 255))
-        instru = font_s.render("Clique em PLAY ou pressione ENTER", True, (230, 230, 230))
+        titulo = render_texto("POWER RANGERS", (255, 215, 0), 80)
+        subt = render_texto("ROBOT DEFENSE", (255, 255, 255), 80)
+        instru = render_texto("Clique em PLAY ou pressione ENTER", (230, 230, 230), 36)
         s.blit(titulo, (LARGURA//2 - titulo.get_width()//2, 120))
         s.blit(subt, (LARGURA//2 - subt.get_width()//2, 200))
         s.blit(instru, (LARGURA//2 - instru.get_width()//2, 360))
@@ -218,6 +840,39 @@ x_inicial = LARGURA//2 - total_largura//2
 botao_play = pygame.Rect(x_inicial, 420, botao_largura, botao_largura)
 botao_profile = pygame.Rect(x_inicial + botao_largura + botao_espacamento, 420, botao_largura, botao_largura)
 
+# Telas paradas (menus, pausa, fim de partida) não giram a FPS: dormem em event.wait e só
+# redesenham quando algo muda. A fila só aceita os eventos que elas tratam.
+EVENTOS_REDESENHO = (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE)
+EVENTOS_MENU = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, *EVENTOS_REDESENHO]
+EVENTOS_TELA_FIXA = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, *EVENTOS_REDESENHO]
+ESPERA_MAXIMA_MS = 1000
+eventos_permitidos = []
+
+def aplicar_eventos_permitidos():
+    if eventos_permitidos:
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(eventos_permitidos[-1])
+    else:
+        pygame.event.set_allowed(None)
+
+@contextlib.contextmanager
+def restringir_eventos(tipos):
+    # Telas abertas umas dentro das outras empilham; ao sair, volta a restrição da tela de fora
+    eventos_permitidos.append(tipos)
+    aplicar_eventos_permitidos()
+    try:
+        yield
+    finally:
+        eventos_permitidos.pop()
+        aplicar_eventos_permitidos()
+
+def esperar_eventos(timeout=ESPERA_MAXIMA_MS):
+    # Dorme até chegar um evento; o timeout só garante que a tela acorda de vez em quando
+    evento = pygame.event.wait(timeout)
+    if evento.type == pygame.NOEVENT:
+        return []
+    return [evento] + pygame.event.get()
+
 def desenhar_hover(surface, rect):
     overlay = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
     overlay.fill((255,255,255,30))
@@ -225,81 +880,103 @@ def desenhar_hover(surface, rect):
 
 def tela_inicial():
     global estado_jogo
-    stop_music()
-    while True:
-        mouse_pos = pygame.mouse.get_pos()
-        TELA.blit(tela_inicial_img, (0,0))
-
-        if botao_play.collidepoint(mouse_pos):
-            desenhar_hover(TELA, botao_play)
-        if botao_profile.collidepoint(mouse_pos):
-            desenhar_hover(TELA, botao_profile)
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    play_sfx('clique_botao')
-                    estado_jogo = "COUNTDOWN"
-                    return
-
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                x, y = event.pos
-                if botao_play.collidepoint(x, y):
-                    play_sfx('clique_botao')
-                    estado_jogo = "COUNTDOWN"
-                    return
-                if botao_profile.collidepoint(x, y):
-                    play_sfx('clique_botao')
-                    abrir_perfil()
-
-        clock.tick(FPS)
-
-def abrir_perfil():
+    musica.parar()
+    # Enquanto o jogador está no menu, a tela de agradecimentos já vai sendo decodificada
+    if imagem_agradecimentos.cache_info().currsize == 0 and not cache_assets.fonte_valida(CAMINHO_AGRADECIMENTOS):
+        assets.antecipar(CAMINHO_AGRADECIMENTOS)
+    with restringir_eventos(EVENTOS_MENU):
+        desenhado = None
+        while True:
+            mouse_pos = pygame.mouse.get_pos()
+            hover = (botao_play.collidepoint(mouse_pos), botao_profile.collidepoint(mouse_pos))
+            if hover != desenhado:
+                TELA.blit(tela_inicial_img, (0,0))
+                if hover[0]:
+                    desenhar_hover(TELA, botao_play)
+                if hover[1]:
+                    desenhar_hover(TELA, botao_profile)
+                pygame.display.flip()
+                desenhado = hover
+
+            for event in esperar_eventos():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+
+                if event.type in EVENTOS_REDESENHO:
+                    desenhado = None
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN:
+                        play_sfx('clique_botao')
+                        estado_jogo = "COUNTDOWN"
+                        return
+
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    x, y = event.pos
+                    if botao_play.collidepoint(x, y):
+                        play_sfx('clique_botao')
+                        estado_jogo = "COUNTDOWN"
+                        return
+                    if botao_profile.collidepoint(x, y):
+                        play_sfx('clique_botao')
+                        abrir_perfil()
+                        desenhado = None
+
+@functools.lru_cache(maxsize=1)
+def imagem_agradecimentos():
     try:
-        img = pygame.image.load(os.path.join(SPRITES_DIR, "Agradecimentos (1).png")).convert()
-        img = pygame.transform.scale(img, (LARGURA, ALTURA))
+        img = cache_assets.via_cache(
+            f"{CAMINHO_AGRADECIMENTOS}@{LARGURA}x{ALTURA}", CAMINHO_AGRADECIMENTOS,
+            lambda: pygame.transform.scale(assets.obter(CAMINHO_AGRADECIMENTOS).convert(), (LARGURA, ALTURA)),
+            alpha=False)
     except Exception:
         img = TELA.copy()
         img.fill((50, 50, 50))
-        font = pygame.font.SysFont(None, 60)
-        text = font.render("Perfil/Agradecimentos (Placeholder)", True, (255, 255, 255))
+        text = render_texto("Perfil/Agradecimentos (Placeholder)", (255, 255, 255), 60)
         img.blit(text, (LARGURA//2 - text.get_width()//2, ALTURA//2 - text.get_height()//2))
+    return img
 
-    rect_voltar = pygame.Rect(40, ALTURA - 120, 80, 80)
+def abrir_perfil():
+    img = imagem_agradecimentos()
 
-    rodando = True
-    while rodando:
-        TELA.blit(img, (0, 0))
-        pygame.display.flip()
+    rect_voltar = pygame.Rect(40, ALTURA - 120, 80, 80)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                return
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if rect_voltar.collidepoint(event.pos):
+    with restringir_eventos(EVENTOS_TELA_FIXA):
+        desenhar = True
+        while True:
+            if desenhar:
+                TELA.blit(img, (0, 0))
+                pygame.display.flip()
+                desenhar = False
+
+            for event in esperar_eventos():
+                if event.type == pygame.QUIT:
+                    pygame.quit(); sys.exit()
+                if event.type in EVENTOS_REDESENHO:
+                    desenhar = True
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     return
-        clock.tick(FPS)
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    if rect_voltar.collidepoint(event.pos):
+                        return
 
-def reset_game_state():
-    global todos_sprites, inimigos, tiros, powerups, tiros_chefao, explosoes, chefao, pontos, cacador_ja_conhecido, jogador, spawn_timer, delay_tiro, tempo_velocidade, tempo_tirotriplo
+def reset_game_state(semente=None):
+    global semente_partida, inimigos, tiros, powerups, tiros_chefao, explosoes, chefao, pontos, cacador_ja_conhecido, jogador, delay_tiro, tempo_velocidade, tempo_tirotriplo
     
-    todos_sprites.empty(); inimigos.empty(); tiros.empty(); powerups.empty(); tiros_chefao.empty(); explosoes.empty();
+    cena.esvaziar(); inimigos.empty(); tiros.empty(); powerups.empty(); tiros_chefao.empty(); explosoes.empty();
+
+    semente_partida = random.randrange(2 ** 63) if semente is None else semente
+    rng.seed(semente_partida)
+    gravador.iniciar(semente_partida)
     
     jogador = Jogador(LARGURA // 2, ALTURA - 60)
-    todos_sprites.add(jogador)
+    cena.adicionar(jogador)
     
     pontos = 0
     chefao = None
     cacador_ja_conhecido = False
-    spawn_timer = 0
+    agendador.reiniciar()
     delay_tiro = 0
     tempo_velocidade = 0
     tempo_tirotriplo = 0
@@ -309,8 +986,9 @@ def contagem_regressiva():
     global estado_jogo
     
     reset_game_state()
+    sprites.antecipar('menu_pause_fundo')
+    musica.antecipar('trilha_jogo')
     
-    fonte = pygame.font.SysFont(None, 200, bold=True)
     contagem_inicial = 5
     tempo_inicio = pygame.time.get_ticks()
     ultimo_numero_tocado = contagem_inicial + 1
@@ -324,7 +1002,7 @@ def contagem_regressiva():
                 pygame.quit(); sys.exit()
 
         if tempo_restante_seg < 1:
-            play_music('trilha_jogo')
+            musica.tocar('trilha_jogo')
             estado_jogo = "NORMAL"
             return
 
@@ -334,8 +1012,8 @@ def contagem_regressiva():
              play_sfx('contagem')
              ultimo_numero_tocado = tempo_restante_seg
         
-        texto = fonte.render(str(tempo_restante_seg), True, (255, 255, 255))
-        sombra = fonte.render(str(tempo_restante_seg), True, (0, 0, 0))
+        texto = render_texto(str(tempo_restante_seg), (255, 255, 255), 200, bold=True)
+        sombra = render_texto(str(tempo_restante_seg), (0, 0, 0), 200, bold=True)
         
         TELA.blit(sombra, (LARGURA // 2 - sombra.get_width() // 2 + 3, ALTURA // 2 - sombra.get_height() // 2 + 3))
         TELA.blit(texto, (LARGURA // 2 - texto.get_width() // 2, ALTURA // 2 - texto.get_height() // 2))
@@ -347,69 +1025,158 @@ def contagem_regressiva():
 def tela_game_over(pontos_finais):
     global estado_jogo
     
-    stop_music()
+    musica.parar()
     play_sfx('game_over')
-    
-    TELA.blit(fundo, (0, 0))
-    overlay = pygame.Surface((LARGURA, ALTURA), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))
-    TELA.blit(overlay, (0, 0))
 
-    font_titulo = pygame.font.SysFont(None, 120, bold=True)
-    font_sub = pygame.font.SysFont(None, 40)
-    
-    titulo = font_titulo.render("GAME OVER", True, (255, 0, 0))
-    score_text = font_sub.render(f"Pontuação Final: {pontos_finais}", True, (255, 255, 255))
-    instrucao = font_sub.render("Pressione ENTER para Recomeçar ou ESC para Menu", True, (150, 150, 150))
-    
+    desenhar_tela_final(fundo_tingido(*TINTA_ESCURECIDA), "GAME OVER", (255, 0, 0), f"Pontuação Final: {pontos_finais}")
+    esperar_escolha_final("GAME_OVER")
+
+def desenhar_tela_final(fundo_final, texto_titulo, cor_titulo, texto_pontos):
+    TELA.blit(fundo_final, (0, 0))
+
+    titulo = render_texto(texto_titulo, cor_titulo, 120, bold=True)
+    score_text = render_texto(texto_pontos, (255, 255, 255), 40)
+    instrucao = render_texto("Pressione ENTER para Recomeçar ou ESC para Menu", (150, 150, 150), 40)
+
     TELA.blit(titulo, (LARGURA // 2 - titulo.get_width() // 2, ALTURA // 3))
     TELA.blit(score_text, (LARGURA // 2 - score_text.get_width() // 2, ALTURA // 2))
     TELA.blit(instrucao, (LARGURA // 2 - instrucao.get_width() // 2, ALTURA * 2 // 3))
-    
-    pygame.display.flip()
 
-    while estado_jogo == "GAME_OVER":
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    estado_jogo = "COUNTDOWN"
-                    return
-                if event.key == pygame.K_ESCAPE:
-                    reset_game_state()
-                    estado_jogo = "MENU"
-                    return
-        clock.tick(FPS)
+    pygame.display.flip()
 
-sprites = {
-    'jogador': carregar_sprite('jogador.png', cor_fallback=(0, 255, 0), largura=60, altura=60),
-    'tiro': carregar_sprite('tiro.png', cor_fallback=(255, 255, 0), largura=12, altura=24),
-    'robo_zigue': carregar_sprite('robo_zigue.png', cor_fallback=(255, 0, 0), largura=50, altura=50),
-    'robo_cacador': carregar_sprite('robo_cacador.png', cor_fallback=(255, 100, 0), largura=50, altura=50),
-    'robo_lento': carregar_sprite('robo_lento.png', cor_fallback=(100, 0, 255), largura=50, altura=50),
-    'robo_rapido': carregar_sprite('robo_rapido.png', cor_fallback=(0, 100, 255), largura=50, altura=50),
-    'robo_ciclico': carregar_sprite('robo_ciclico.png', cor_fallback=(255, 0, 100), largura=50, altura=50),
-    'robo_saltador': carregar_sprite('robo_saltador.png', cor_fallback=(150, 0, 150), largura=50, altura=50),
-    'power_vida': carregar_sprite('power_vida.png', cor_fallback=(0, 0, 255), largura=40, altura=40),
-    'power_velocidade': carregar_sprite('power_velocidade.png', cor_fallback=(163, 73, 14), largura=40, altura=40),
-    'power_tirotriplo': carregar_sprite('power_tirotriplo.png', cor_fallback=(255, 141, 161), largura=40, altura=40),
-    'boss': carregar_sprite('boss.png', cor_fallback=(0, 0, 150), largura=150, altura=150),
-    'boss_tiro': carregar_sprite('boss_tiro.png', cor_fallback=(0, 0, 255), largura=25, altura=35),
-    'explosao': carregar_sprite('tentativa.png', cor_fallback=(255, 255, 255), largura=274, altura=384),
-    'pause_button_sprite': carregar_sprite('Botaopause.jpg', cor_fallback=(0, 0, 0), largura=60, altura=60),
-    'menu_pause_fundo': carregar_sprite('Pause.jpg', cor_fallback=(0, 0, 100))  
-}
+def esperar_escolha_final(estado):
+    # A tela final não muda: guarda o quadro e só o repõe quando a janela precisa ser redesenhada
+    global estado_jogo
+    quadro = TELA.copy()
+    with restringir_eventos(EVENTOS_TELA_FIXA):
+        while estado_jogo == estado:
+            for event in esperar_eventos():
+                if event.type == pygame.QUIT:
+                    pygame.quit(); sys.exit()
+
+                if event.type in EVENTOS_REDESENHO:
+                    TELA.blit(quadro, (0, 0))
+                    pygame.display.flip()
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN:
+                        reset_game_state()
+                        estado_jogo = "COUNTDOWN"
+                        return
+                    if event.key == pygame.K_ESCAPE:
+                        reset_game_state()
+                        estado_jogo = "MENU"
+                        return
+
+class AtlasSprites:
+    # Empacota várias superfícies numa folha só, em prateleiras (das mais altas para as mais
+    # baixas). Quem recebe a subsuperfície continua usando .image normalmente; origem mapeia
+    # cada subsuperfície para (folha, área) para que o desenho saia direto da folha.
+    def __init__(self, largura=512, espaco=1):
+        self.largura = largura
+        self.espaco = espaco
+        self.folhas = []
+        self.origem = {}
+
+    def empacotar(self, superficies):
+        largura = max(self.largura, *(s.get_width() for s in superficies.values()))
+        x = y = altura_prateleira = 0
+        areas = {}
+        for chave in sorted(superficies, key=lambda c: superficies[c].get_height(), reverse=True):
+            w, h = superficies[chave].get_size()
+            if x + w > largura:
+                x = 0
+                y += altura_prateleira + self.espaco
+                altura_prateleira = 0
+            areas[chave] = pygame.Rect(x, y, w, h)
+            x += w + self.espaco
+            altura_prateleira = max(altura_prateleira, h)
+
+        folha = pygame.Surface((largura, y + altura_prateleira), pygame.SRCALPHA)
+        for chave, area in areas.items():
+            # Somar sobre a folha transparente copia os pixels sem misturar o alpha
+            folha.blit(superficies[chave], area, special_flags=pygame.BLEND_RGBA_ADD)
+        folha = folha.convert_alpha()
+        self.folhas.append(folha)
+
+        recortes = {}
+        for chave, area in areas.items():
+            recorte = recortes[chave] = folha.subsurface(area)
+            self.origem[recorte] = (folha, area)
+        return recortes
+
+atlas = AtlasSprites()
+
+# Arte das entidades, empacotada por grupo de carregamento: a do chefão só quando ele aparece
+GRUPOS_ATLAS = (
+    ('jogador', 'tiro', 'robo_zigue', 'robo_cacador', 'robo_lento', 'robo_rapido', 'robo_ciclico',
+     'robo_saltador', 'power_vida', 'power_velocidade', 'power_tirotriplo'),
+    ('boss', 'boss_tiro'),
+)
+GRUPO_ATLAS_DE = {chave: grupo for grupo in GRUPOS_ATLAS for chave in grupo}
+
+class SpritesPreguicosos(dict):
+    # sprites[chave] termina de carregar (converte, escala ou cai no fallback) no primeiro acesso;
+    # se a chave é de um grupo do atlas, o grupo inteiro carrega e vai para uma folha
+    def carregar(self, chave):
+        nome_arquivo, cor_fallback, largura, altura, _ = ASSETS_SPRITES[chave]
+        return carregar_sprite(chave, nome_arquivo, cor_fallback=cor_fallback, largura=largura, altura=altura)
+
+    def __missing__(self, chave):
+        grupo = GRUPO_ATLAS_DE.get(chave)
+        if grupo is None:
+            superficie = self[chave] = self.carregar(chave)
+            return superficie
+        self.update(atlas.empacotar({c: self.carregar(c) for c in grupo}))
+        return self[chave]
+
+    def antecipar(self, *chaves):
+        # Começa a decodificar em segundo plano o que ainda vai ser usado
+        caminhos = (os.path.join(SPRITES_DIR, ASSETS_SPRITES[c][0]) for c in chaves if c not in self)
+        assets.antecipar(*(c for c in caminhos if not cache_assets.fonte_valida(c)))
+
+sprites = SpritesPreguicosos()
+for chave, (_, _, _, _, critico) in ASSETS_SPRITES.items():
+    if critico:
+        sprites[chave]
+cache_assets.salvar()
+
+# Ordem de desenho da cena, de baixo para cima
+CAMADA_INIMIGOS = 0
+CAMADA_POWERUPS = 1
+CAMADA_TIROS = 2
+CAMADA_JOGADOR = 3
+CAMADA_TIROS_CHEFAO = 4
+CAMADA_EXPLOSOES = 5
 
 class Entidade(pygame.sprite.Sprite):
+    movimento_vetorizado = None
+    camada = CAMADA_INIMIGOS
+    # Usados pelo GerenciadorDescarte: idade máxima em ticks (None = sem limite),
+    # se pode ser descartado e quem sai primeiro quando um grupo passa do limite (menor antes)
+    vida_maxima = None
+    descartavel = True
+    prioridade_descarte = 2
+    nascimento = 0
+    a_caminho = False
+
     def __init__(self, x, y, velocidade, image_key):
         super().__init__()
         self.velocidade = velocidade
         self.image = sprites[image_key]
         self.rect = self.image.get_rect(center=(x, y))
+        self.armazem = None
+        self.indice_armazem = -1
+
+    def kill(self):
+        if self.armazem is not None:
+            self.armazem.remover(self)
+        super().kill()
 
 class Jogador(Entidade):
+    camada = CAMADA_JOGADOR
+    descartavel = False
+
     def __init__(self, x, y):
         self.velocidade_original = 5
         super().__init__(x, y, self.velocidade_original, 'jogador')
@@ -418,6 +1185,7 @@ class Jogador(Entidade):
         self.transformado = False
         self.cacador_desabilitado = False
         self.delay_transformacao = 0
+        self.teclas = None
 
     def ativar_transformacao(self):
         if not self.transformado:
@@ -428,7 +1196,7 @@ class Jogador(Entidade):
             self.transformado = False
 
     def update(self):
-        keys = pygame.key.get_pressed()
+        keys = self.teclas if self.teclas is not None else pygame.key.get_pressed()
         if keys[pygame.K_w]:
             self.rect.y -= self.velocidade
         if keys[pygame.K_s]:
@@ -441,18 +1209,43 @@ class Jogador(Entidade):
         self.rect.x = max(0, min(self.rect.x, LARGURA - self.rect.width))
         self.rect.y = max(0, min(self.rect.y, ALTURA - self.rect.height))
 
-class Tiro(Entidade):
+class Reciclavel:
+    # Sprites de vida curta: ao morrer voltam para pool_sprites em vez de irem para o GC
+    na_pool = False
+
+    def kill(self):
+        vivo = self.alive()
+        super().kill()
+        if vivo:
+            pool_sprites.devolver(self)
+
+class Tiro(Reciclavel, Entidade):
+    movimento_vetorizado = 'tiro'
+    camada = CAMADA_TIROS
+    vida_maxima = TICKS_POR_SEGUNDO * 5
+    prioridade_descarte = 1
+
     def __init__(self, x, y):
         super().__init__(x, y, velocidade=8, image_key='tiro')
+    def reiniciar(self, x, y):
+        self.rect.center = (x, y)
     def update(self):
         self.rect.y -= self.velocidade
         if self.rect.y < 0:
             self.kill()
 
-class TiroDiagonal(Entidade):
+class TiroDiagonal(Reciclavel, Entidade):
+    movimento_vetorizado = 'diagonal'
+    camada = CAMADA_TIROS
+    vida_maxima = TICKS_POR_SEGUNDO * 5
+    prioridade_descarte = 1
+
     def __init__(self, x, y, direcao):
         super().__init__(x, y, velocidade=8, image_key='tiro')
         self.direcao = direcao
+    def reiniciar(self, x, y, direcao):
+        self.rect.center = (x, y)
+        self.direcao = direcao
     def update(self):
         self.rect.y -= self.velocidade
         self.rect.x += self.velocidade * 0.5 * self.direcao
@@ -460,6 +1253,8 @@ class TiroDiagonal(Entidade):
             self.kill()
 
 class RoboZigueZague(Entidade):
+    movimento_vetorizado = 'zigue'
+
     def __init__(self, x, y):
         super().__init__(x, y, velocidade=3, image_key='robo_zigue')
         self.direcao = 1
@@ -478,6 +1273,9 @@ class RoboZigueZague(Entidade):
             self.kill()
 
 class RoboCacador(Entidade):
+    # Fica preso dentro da tela perseguindo o jogador, então só sai pela idade
+    vida_maxima = TICKS_POR_SEGUNDO * 20
+
     def __init__(self, x, y):
         super().__init__(x, y, velocidade=2, image_key='robo_cacador')
     def update(self):
@@ -502,6 +1300,8 @@ class RoboCacador(Entidade):
             self.kill()
 
 class RoboLento(Entidade):
+    movimento_vetorizado = 'queda'
+
     def __init__(self, x, y):
         super().__init__(x, y, velocidade=1, image_key='robo_lento')
     def update(self):
@@ -509,6 +1309,8 @@ class RoboLento(Entidade):
         if self.rect.top > ALTURA: self.kill()
 
 class RoboRapido(Entidade):
+    movimento_vetorizado = 'queda'
+
     def __init__(self, x, y):
         super().__init__(x, y, velocidade=5, image_key='robo_rapido')
     def update(self):
@@ -521,7 +1323,7 @@ class RoboCircular(Entidade):
        
         self.centro_x = float(self.rect.centerx)
         self.centro_y = float(self.rect.centery)
-        self.angulo = random.uniform(0, 360)
+        self.angulo = rng.uniform(0, 360)
         self.raio = raio
         self.v_angular = v_angular
 
@@ -547,7 +1349,7 @@ class RoboPulante(Entidade):
         self.jump_v = 0.0
         self.gravity = 0.8
         self.jump_strength_range = (8.0, 12.0)
-        self.next_jump_timer = random.randint(20, 60)
+        self.next_jump_timer = rng.randint(20, 60)
         self.next_jump_timer = self.next_jump_timer
 
     def update(self):
@@ -555,8 +1357,8 @@ class RoboPulante(Entidade):
 
         self.next_jump_timer -= 1
         if self.next_jump_timer <= 0 and self.jump_v == 0.0:
-            self.jump_v = -random.uniform(*self.jump_strength_range)
-            self.next_jump_timer = random.randint(30, 80)
+            self.jump_v = -rng.uniform(*self.jump_strength_range)
+            self.next_jump_timer = rng.randint(30, 80)
 
        
         if self.jump_v != 0.0:
@@ -574,19 +1376,31 @@ class RoboPulante(Entidade):
             self.kill()
 
 class Boss(Entidade):
+    descartavel = False
+
     def __init__(self, x, y):
         super().__init__(x, y, velocidade=1, image_key='boss')
-        self.vida = 100
+        self.vida = VIDA_CHEFAO
         self.delay_tiro = 0  
     def update(self):
         self.rect.x += self.velocidade
         if self.rect.left < 0 or self.rect.right > LARGURA:
             self.velocidade *= -1
 
-class BossTiro(Entidade):
+class BossTiro(Reciclavel, Entidade):
+    movimento_vetorizado = 'mira'
+    camada = CAMADA_TIROS_CHEFAO
+    vida_maxima = TICKS_POR_SEGUNDO * 10
+
     def __init__(self, x, y, jogador_pos):
         super().__init__(x, y, velocidade=5, image_key='boss_tiro')
-        
+        self.mirar(x, y, jogador_pos)
+
+    def reiniciar(self, x, y, jogador_pos):
+        self.rect.center = (x, y)
+        self.mirar(x, y, jogador_pos)
+
+    def mirar(self, x, y, jogador_pos):
         dx = jogador_pos[0] - x
         dy = jogador_pos[1] - y
         distancia = math.sqrt(dx**2 + dy**2)
@@ -605,24 +1419,47 @@ class BossTiro(Entidade):
         if self.rect.top > ALTURA or self.rect.bottom < 0 or self.rect.left > LARGURA or self.rect.right < 0:
             self.kill()
 
-class PowerUp(Entidade):
+class PowerUp(Reciclavel, Entidade):
+    camada = CAMADA_POWERUPS
+    vida_maxima = TICKS_POR_SEGUNDO * 20
+    prioridade_descarte = 1
+    key_map = {"vida": "power_vida", "velocidade": "power_velocidade", "tirotriplo": "power_tirotriplo"}
+
     def __init__(self, x, y, tipo):
         self.tipo = tipo
-        key_map = {"vida": "power_vida", "velocidade": "power_velocidade", "tirotriplo": "power_tirotriplo"}
-        super().__init__(x, y, velocidade=2, image_key=key_map.get(tipo, 'power_vida'))
+        super().__init__(x, y, velocidade=2, image_key=self.key_map.get(tipo, 'power_vida'))
+    def reiniciar(self, x, y, tipo):
+        self.tipo = tipo
+        self.image = sprites[self.key_map.get(tipo, 'power_vida')]
+        self.rect = self.image.get_rect(center=(x, y))
     def update(self):
         self.rect.y += self.velocidade
         if self.rect.top > ALTURA: self.kill()
 
-class Explosao(pygame.sprite.Sprite):
+class Explosao(Reciclavel, pygame.sprite.Sprite):
+    camada = CAMADA_EXPLOSOES
+    vida_maxima = TICKS_POR_SEGUNDO * 2
+    descartavel = True
+    prioridade_descarte = 0
+    nascimento = 0
+    a_caminho = False
+    # (colunas, linhas) da folha em sprites['explosao']
+    FOLHA = (1, 1)
+
     def __init__(self, x, y):
         super().__init__()
-        self.frames = [pygame.transform.scale(sprites['explosao'], (80, 80))]
+        self.frames = folha_sprite('explosao', *self.FOLHA, (80, 80))
         self.frame_index = 0
         self.image = self.frames[self.frame_index]
         self.rect = self.image.get_rect(center=(x, y))
         self.counter = 0
 
+    def reiniciar(self, x, y):
+        self.frame_index = 0
+        self.image = self.frames[self.frame_index]
+        self.rect.center = (x, y)
+        self.counter = 0
+
     def update(self):
         self.counter += 1
         if self.counter >= 15:
@@ -633,22 +1470,402 @@ class Explosao(pygame.sprite.Sprite):
             else:
                 self.image = self.frames[self.frame_index]
 
-todos_sprites = pygame.sprite.Group()
+class GradeEspacial:
+    # Broadphase de colisão: distribui os rects em células de uma grade uma vez por tick
+    # e responde às consultas olhando só as células vizinhas, em vez de testar todos contra todos.
+    # Grupos pequenos não compensam a montagem da grade: ficam sem grade e as consultas vão
+    # direto para spritecollide/groupcollide do pygame.
+    def __init__(self, tamanho_celula=64, minimo_sprites=160):
+        self.tamanho_celula = tamanho_celula
+        self.minimo_sprites = minimo_sprites
+        self.grades = {}
+
+    def reconstruir(self, *grupos):
+        t = self.tamanho_celula
+        self.grades = {}
+        for grupo in grupos:
+            if len(grupo) < self.minimo_sprites:
+                continue
+            celulas = {}
+            for sprite in grupo.sprites():
+                r = sprite.rect
+                for cx in range(r.left // t, (r.right - 1) // t + 1):
+                    for cy in range(r.top // t, (r.bottom - 1) // t + 1):
+                        lista = celulas.get((cx, cy))
+                        if lista is None:
+                            celulas[(cx, cy)] = [sprite]
+                        else:
+                            lista.append(sprite)
+            self.grades[grupo] = celulas
+
+    def candidatos(self, rect, grupo):
+        celulas = self.grades.get(grupo)
+        if celulas is None:
+            return grupo.sprites()
+        t = self.tamanho_celula
+        x0, x1 = rect.left // t, (rect.right - 1) // t
+        y0, y1 = rect.top // t, (rect.bottom - 1) // t
+        if x0 == x1 and y0 == y1:
+            return celulas.get((x0, y0), ())
+        # dict em vez de set para manter a ordem determinística
+        vistos = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for sprite in celulas.get((cx, cy), ()):
+                    vistos[sprite] = None
+        return list(vistos)
+
+    def usa_grade(self, grupo):
+        return grupo in self.grades
+
+    def colidindo(self, sprite, grupo, dokill=False):
+        # Equivalente a pygame.sprite.spritecollide, consultando a grade
+        if grupo not in self.grades:
+            return pygame.sprite.spritecollide(sprite, grupo, dokill)
+        candidatos = self.candidatos(sprite.rect, grupo)
+        if not candidatos:
+            return []
+        membros = grupo.spritedict
+        atingidos = [candidatos[i] for i in sprite.rect.collidelistall([s.rect for s in candidatos])
+                     if candidatos[i] in membros]
+        if dokill:
+            for s in atingidos:
+                s.kill()
+        return atingidos
+
+    def colisoes_grupos(self, grupo_a, grupo_b, dokill_a=False, dokill_b=False):
+        # Equivalente a pygame.sprite.groupcollide, consultando a grade
+        if grupo_b not in self.grades:
+            return pygame.sprite.groupcollide(grupo_a, grupo_b, dokill_a, dokill_b)
+        colisoes = {}
+        for sprite in grupo_a.sprites():
+            atingidos = self.colidindo(sprite, grupo_b, dokill_b)
+            if atingidos:
+                colisoes[sprite] = atingidos
+                if dokill_a:
+                    sprite.kill()
+        return colisoes
+
+class ArmazemEntidades:
+    # Guarda posições e velocidades das entidades de movimento simples em arrays NumPy
+    # (estrutura de arrays) e move todas com uma passada vetorizada por regra, sem chamar
+    # update() sprite a sprite. Os sprites continuam nos grupos de colisão e são desenhados pela Cena.
+    REGRAS = {'queda': 0, 'zigue': 1, 'tiro': 2, 'diagonal': 3, 'mira': 4}
+    X, Y, VX, VY, W, H = range(6)
+    # Setters de Rect.x/Rect.y em C, aplicados com map() na devolução das posições aos rects
+    _definir_x = pygame.Rect.__dict__['x'].__set__
+    _definir_y = pygame.Rect.__dict__['y'].__set__
+
+    def __init__(self, capacidade=256):
+        self.dados = np.zeros((capacidade, 6), dtype=np.float64)
+        self.regra = np.zeros(capacidade, dtype=np.int8)
+        self.sprites = []
+        self.rects = []
+        self.n = 0
+
+    def _velocidade_inicial(self, sprite):
+        regra = sprite.movimento_vetorizado
+        v = sprite.velocidade
+        if regra == 'queda':
+            return 0, v
+        if regra == 'zigue':
+            return sprite.direcao * sprite.hspeed, v
+        if regra == 'tiro':
+            return 0, -v
+        if regra == 'diagonal':
+            return v * 0.5 * sprite.direcao, -v
+        return sprite.dx * v, sprite.dy * v
+
+    def adicionar(self, sprite):
+        if self.n == len(self.dados):
+            self.dados = np.concatenate([self.dados, np.zeros_like(self.dados)])
+            self.regra = np.concatenate([self.regra, np.zeros_like(self.regra)])
+        i = self.n
+        r = sprite.rect
+        vx, vy = self._velocidade_inicial(sprite)
+        self.dados[i] = (r.x, r.y, vx, vy, r.width, r.height)
+        self.regra[i] = self.REGRAS[sprite.movimento_vetorizado]
+        self.sprites.append(sprite)
+        self.rects.append(r)
+        sprite.armazem = self
+        sprite.indice_armazem = i
+        self.n += 1
+
+    def remover(self, sprite):
+        i = sprite.indice_armazem
+        ultimo = self.n - 1
+        if i != ultimo:
+            self.dados[i] = self.dados[ultimo]
+            self.regra[i] = self.regra[ultimo]
+            movido = self.sprites[ultimo]
+            self.sprites[i] = movido
+            self.rects[i] = self.rects[ultimo]
+            movido.indice_armazem = i
+        self.sprites.pop()
+        self.rects.pop()
+        self.n -= 1
+        sprite.armazem = None
+        sprite.indice_armazem = -1
+
+    def limpar(self):
+        for sprite in self.sprites:
+            sprite.armazem = None
+            sprite.indice_armazem = -1
+        self.sprites = []
+        self.rects = []
+        self.n = 0
+
+    def retirar_todos(self):
+        # Devolve os sprites para o update() de cada um. As posições já estão nos rects;
+        # do resto, só a direção do zigue-zague muda aqui dentro.
+        zigue = self.REGRAS['zigue']
+        for i in np.flatnonzero(self.regra[:self.n] == zigue).tolist():
+            self.sprites[i].direcao = 1 if self.dados[i, self.VX] > 0 else -1
+        sprites = self.sprites
+        self.limpar()
+        return sprites
+
+    def atualizar(self):
+        n = self.n
+        if n == 0:
+            return
+        d = self.dados[:n]
+        regra = self.regra[:n]
+        x, y, vx, w, h = d[:, self.X], d[:, self.Y], d[:, self.VX], d[:, self.W], d[:, self.H]
+
+        # Rect arredonda frações para longe do zero; repetimos isso para manter o mesmo trajeto
+        d[:, :2] += d[:, 2:4]
+        d[:, :2] = np.trunc(d[:, :2] + np.copysign(0.5, d[:, :2]))
+
+        zigue = regra == self.REGRAS['zigue']
+        vx[zigue & ((x <= 0) | (x + w >= LARGURA))] *= -1
+
+        cai = (regra == self.REGRAS['queda']) | zigue
+        mortos = cai & (y > ALTURA)
+        mortos |= (regra == self.REGRAS['tiro']) & (y < 0)
+        mortos |= (regra == self.REGRAS['diagonal']) & ((y < 0) | (x < 0) | (x > LARGURA))
+        mortos |= (regra == self.REGRAS['mira']) & ((y > ALTURA) | (y + h < 0) | (x > LARGURA) | (x + w < 0))
+
+        for i in np.flatnonzero(mortos)[::-1].tolist():
+            self.sprites[i].kill()
+
+        d = self.dados[:self.n]
+        deque(map(self._definir_x, self.rects, d[:, self.X].astype(np.int64).tolist()), maxlen=0)
+        deque(map(self._definir_y, self.rects, d[:, self.Y].astype(np.int64).tolist()), maxlen=0)
+
+class PoolSprites:
+    # Recicla os sprites de vida curta (tiros, explosões, power-ups). obter() reaproveita um
+    # sprite morto da mesma classe chamando reiniciar(), ou cria um novo se a pool estiver vazia.
+    def __init__(self, limite_por_classe=512):
+        self.limite_por_classe = limite_por_classe
+        self.livres = {}
+        self.acertos = {}
+        self.falhas = {}
+
+    def obter(self, classe, *args):
+        nome = classe.__name__
+        livres = self.livres.get(classe)
+        while livres:
+            sprite = livres.pop()
+            sprite.na_pool = False
+            if sprite.alive():
+                # foi readicionado a um grupo depois de morrer
+                continue
+            sprite.reiniciar(*args)
+            self.acertos[nome] = self.acertos.get(nome, 0) + 1
+            return sprite
+        self.falhas[nome] = self.falhas.get(nome, 0) + 1
+        return classe(*args)
+
+    def devolver(self, sprite):
+        if sprite.na_pool:
+            return
+        livres = self.livres.setdefault(type(sprite), [])
+        if len(livres) < self.limite_por_classe:
+            sprite.na_pool = True
+            livres.append(sprite)
+
+    def estatisticas(self):
+        nomes = sorted(set(self.acertos) | set(self.falhas))
+        return {
+            nome: {
+                'acertos': self.acertos.get(nome, 0),
+                'falhas': self.falhas.get(nome, 0),
+                'livres': sum(len(l) for c, l in self.livres.items() if c.__name__ == nome),
+            }
+            for nome in nomes
+        }
+
+pool_sprites = PoolSprites()
+
+# Posição de cada sprite antes do tick atual, para a interpolação do desenho
+posicoes_anteriores = {}
+
+class Cena:
+    # Dona do update e do desenho: cada entidade é atualizada e desenhada uma única vez por
+    # tick, na ordem das camadas. Os grupos (inimigos, tiros...) servem só para consultas.
+    # O armazém NumPy tem um custo fixo por tick que só se paga com muitas entidades: os sprites
+    # vetorizáveis entram nele quando chegam a LIMIAR_ARMAZEM e voltam quando caem abaixo da metade.
+    LIMIAR_ARMAZEM = 200
+    INTERVALO_ARMAZEM = 30
+
+    def __init__(self, armazem=None):
+        self.sprites = pygame.sprite.LayeredUpdates()
+        self.armazem = armazem
+        self.armazem_ativo = False
+        self.tick = 0
+
+    def adicionar(self, sprite, *grupos):
+        sprite.nascimento = self.tick
+        # Nasceu acima da tela (robôs do fundo de uma formação): ainda está a caminho
+        sprite.a_caminho = sprite.rect.bottom <= 0
+        # Sprite vindo da pool: a posição guardada é da vida anterior e não pode ser interpolada
+        posicoes_anteriores.pop(sprite, None)
+        if self.armazem_ativo and getattr(sprite, 'movimento_vetorizado', None):
+            self.armazem.adicionar(sprite)
+        else:
+            self.sprites.add(sprite, layer=sprite.camada)
+        for grupo in grupos:
+            grupo.add(sprite)
+
+    def esvaziar(self):
+        self.tick = 0
+        self.sprites.empty()
+        if self.armazem is not None:
+            self.armazem.limpar()
+            self.armazem_ativo = False
+
+    def todos(self):
+        if not self.armazem_ativo:
+            return self.sprites.sprites()
+        return self.sprites.sprites() + self.armazem.sprites
+
+    def ajustar_armazem(self):
+        if self.armazem_ativo:
+            if self.armazem.n < self.LIMIAR_ARMAZEM // 2:
+                for sprite in self.armazem.retirar_todos():
+                    self.sprites.add(sprite, layer=sprite.camada)
+                self.armazem_ativo = False
+            return
+        vetorizaveis = [s for s in self.sprites if getattr(s, 'movimento_vetorizado', None)]
+        if len(vetorizaveis) >= self.LIMIAR_ARMAZEM:
+            self.sprites.remove(*vetorizaveis)
+            for sprite in vetorizaveis:
+                self.armazem.adicionar(sprite)
+            self.armazem_ativo = True
+
+    def atualizar(self):
+        self.tick += 1
+        if self.armazem is not None and self.tick % self.INTERVALO_ARMAZEM == 0:
+            self.ajustar_armazem()
+        self.sprites.update()
+        if self.armazem_ativo:
+            self.armazem.atualizar()
+
+    @staticmethod
+    def blits(superficie, lote):
+        # Imagens que estão no atlas saem da folha com a área delas: o lote vira um único blits
+        origem = atlas.origem
+        itens = []
+        for s in lote:
+            regiao = origem.get(s.image)
+            if regiao is None:
+                itens.append((s.image, posicao_interpolada(s)))
+            else:
+                itens.append((regiao[0], posicao_interpolada(s), regiao[1]))
+        return superficie.blits(itens)
+
+    def desenhar(self, superficie):
+        if not self.armazem_ativo or not self.armazem.sprites:
+            return self.blits(superficie, self.sprites.sprites())
+
+        # Os sprites do armazém entram na camada de cada um
+        do_armazem = {}
+        for s in self.armazem.sprites:
+            do_armazem.setdefault(s.camada, []).append(s)
+        rects = []
+        for camada in sorted(set(self.sprites.layers()) | set(do_armazem)):
+            lote = self.sprites.get_sprites_from_layer(camada) + do_armazem.get(camada, [])
+            rects += self.blits(superficie, lote)
+        return rects
+
+class GerenciadorDescarte:
+    # Passada central de descarte: tira da cena o que saiu da tela (com margem) ou passou da
+    # idade máxima da sua classe, e mantém cada grupo abaixo do seu limite descartando primeiro
+    # a menor prioridade e, dentro dela, o mais antigo. Conta tudo por motivo e por classe.
+    MARGEM = 150
+
+    def __init__(self, cena, limites, intervalo=10):
+        self.cena = cena
+        self.limites = limites
+        self.intervalo = intervalo
+        self.area = pygame.Rect(-self.MARGEM, -self.MARGEM, LARGURA + 2 * self.MARGEM, ALTURA + 2 * self.MARGEM)
+        self.contagens = {'fora_da_tela': {}, 'idade': {}, 'limite': {}}
+
+    def _descartar(self, sprite, motivo):
+        nome = type(sprite).__name__
+        self.contagens[motivo][nome] = self.contagens[motivo].get(nome, 0) + 1
+        sprite.kill()
+
+    def executar(self):
+        tick = self.cena.tick
+        if tick % self.intervalo == 0:
+            area = self.area
+            for sprite in self.cena.todos():
+                if not sprite.descartavel:
+                    continue
+                if sprite.a_caminho and sprite.rect.bottom > 0:
+                    sprite.a_caminho = False
+                if not area.colliderect(sprite.rect):
+                    # Quem ainda não apareceu na tela não conta como saído dela
+                    if not sprite.a_caminho:
+                        self._descartar(sprite, 'fora_da_tela')
+                elif sprite.vida_maxima is not None and tick - sprite.nascimento > sprite.vida_maxima:
+                    self._descartar(sprite, 'idade')
+
+        for grupo, limite in self.limites:
+            excesso = len(grupo) - limite
+            if excesso > 0:
+                candidatos = sorted((s for s in grupo.sprites() if s.descartavel),
+                                    key=lambda s: (s.prioridade_descarte, s.nascimento))
+                for sprite in candidatos[:excesso]:
+                    self._descartar(sprite, 'limite')
+
+    def relatorio(self):
+        return {motivo: dict(por_classe) for motivo, por_classe in self.contagens.items() if por_classe}
+
 inimigos = pygame.sprite.Group()
 tiros = pygame.sprite.Group()
 powerups = pygame.sprite.Group()
 tiros_chefao = pygame.sprite.Group()
 explosoes = pygame.sprite.Group()
 
+grade_colisao = GradeEspacial()
+
+# Armazém vetorizado opcional (ROBOT_DEFENSE_NUMPY=1 ou --numpy), pensado para muitos robôs na tela;
+# a Cena só o usa enquanto houver entidades suficientes (Cena.LIMIAR_ARMAZEM)
+USAR_ARMAZEM_NUMPY = ((os.environ.get("ROBOT_DEFENSE_NUMPY") == "1" or "--numpy" in sys.argv)
+                      and recursos.carregar('numpy') is not None)
+cena = Cena(ArmazemEntidades() if USAR_ARMAZEM_NUMPY else None)
+
+# Limites rígidos de entidades vivas por grupo
+descarte = GerenciadorDescarte(cena, [
+    (inimigos, 300),
+    (tiros, 400),
+    (tiros_chefao, 200),
+    (explosoes, 100),
+    (powerups, 30),
+])
+
 jogador = Jogador(LARGURA // 2, ALTURA - 60)
-todos_sprites.add(jogador)
+cena.adicionar(jogador)
 
 chefao = None
 pontos = 0
-spawn_timer = 0
 tempo_velocidade = 0
 tempo_tirotriplo = 0
 delay_tiro = 0
+aviso_timer = 0
 
 cacador_transformacao = None
 cacador_ja_conhecido = False
@@ -671,79 +1888,157 @@ def menu_pausa():
     rect_play = pygame.Rect(menu_rect.left, menu_rect.top, col_w, menu_h)
     rect_musica = pygame.Rect(menu_rect.left + col_w, menu_rect.top, col_w, menu_h) 
     rect_sair = pygame.Rect(menu_rect.left + 2 * col_w, menu_rect.top, col_w, menu_h)
-    
-    stop_music()
-    
-    while estado_jogo == "PAUSED":
-        
-        TELA.blit(fundo_pausa, (0, 0))
-        TELA.blit(menu_img, menu_rect)
-        
-        pygame.display.flip()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+    musica.pausar()
 
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                estado_jogo = "NORMAL" if chefao is None else "BOSS"
-                if music_status:
-                    play_music('trilha_boss' if chefao else 'trilha_jogo')
-                return
-            
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                x, y = event.pos
-                
-                if rect_play.collidepoint(x, y):
-                    play_sfx('clique_botao')
-                    estado_jogo = "NORMAL" if chefao is None else "BOSS"
-                    if music_status:
-                        play_music('trilha_boss' if chefao else 'trilha_jogo')
-                    return
-                
-                elif rect_musica.collidepoint(x, y):
-                    play_sfx('clique_botao')
-                    music_status = not music_status
-                    print(f"Música: {'Ligada' if music_status else 'Desligada'}")
+    with restringir_eventos(EVENTOS_TELA_FIXA):
+        desenhar = True
+        while estado_jogo == "PAUSED":
+            if desenhar:
+                TELA.blit(fundo_pausa, (0, 0))
+                TELA.blit(menu_img, menu_rect)
+                pygame.display.flip()
+                desenhar = False
 
-                elif rect_sair.collidepoint(x, y):
-                    play_sfx('clique_botao')
-                    reset_game_state()
-                    estado_jogo = "MENU"
-                    return
+            for event in esperar_eventos():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
 
-        clock.tick(FPS)
+                if event.type in EVENTOS_REDESENHO:
+                    desenhar = True
 
-intro_video = "lv_0_20251208094527.mp4"
-if OPENCV_OK and os.path.exists(intro_video):
-    try:
-        tocar_video_intro(intro_video)
-    except Exception as e:
-        print("Falha ao reproduzir intro:", e)
-else:
-    print("Cutscene pulada (OpenCV ausente ou arquivo não existe).")
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    estado_jogo = "NORMAL" if chefao is None else "BOSS"
+                    musica.tocar('trilha_boss' if chefao else 'trilha_jogo')
+                    return
 
-rodando = True
-while rodando:
-    clock.tick(FPS)
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    x, y = event.pos
+
+                    if rect_play.collidepoint(x, y):
+                        play_sfx('clique_botao')
+                        estado_jogo = "NORMAL" if chefao is None else "BOSS"
+                        musica.tocar('trilha_boss' if chefao else 'trilha_jogo')
+                        return
+
+                    elif rect_musica.collidepoint(x, y):
+                        play_sfx('clique_botao')
+                        music_status = not music_status
+                        print(f"Música: {'Ligada' if music_status else 'Desligada'}")
+
+                    elif rect_sair.collidepoint(x, y):
+                        play_sfx('clique_botao')
+                        reset_game_state()
+                        estado_jogo = "MENU"
+                        return
+
+class Perfilador:
+    # Mede quanto cada fase do quadro custa. marcar(fase) soma à fase o tempo desde a marca
+    # anterior, então as fases podem se repetir (a simulação roda vários ticks por quadro).
+    FASES = ['eventos', 'entrada', 'chefao', 'spawn', 'powerups', 'colisoes', 'update',
+             'descarte', 'fundo', 'sprites', 'hud', 'flip']
+    GRUPOS = ['inimigos', 'tiros', 'tiros_chefao', 'explosoes', 'powerups']
+
+    def __init__(self, janela=240):
+        self.ativo = False
+        self.visivel = False
+        self.historico = {fase: deque(maxlen=janela) for fase in self.FASES + ['total']}
+        self.atual = dict.fromkeys(self.FASES, 0.0)
+        self.contagens = dict.fromkeys(self.GRUPOS, 0)
+        self.quadro = 0
+        self.inicio_quadro = self.ultima_marca = time.perf_counter()
+        self.linhas_overlay = []
+        self.fundo_overlay = None
+        self.arquivo_csv = None
+        self.escritor_csv = None
+
+    def exportar_csv(self, caminho):
+        self.arquivo_csv = open(caminho, 'w', newline='')
+        self.escritor_csv = csv.writer(self.arquivo_csv)
+        self.escritor_csv.writerow(['quadro', 'total_ms'] + [f"{fase}_ms" for fase in self.FASES] + self.GRUPOS)
+
+    def fechar(self):
+        if self.arquivo_csv is not None:
+            self.arquivo_csv.close()
+            self.arquivo_csv = self.escritor_csv = None
+
+    def iniciar_quadro(self):
+        if not self.ativo:
+            return
+        for fase in self.atual:
+            self.atual[fase] = 0.0
+        self.inicio_quadro = self.ultima_marca = time.perf_counter()
 
-    if estado_jogo == "MENU":
-        tela_inicial()
-        continue
-    
-    if estado_jogo == "COUNTDOWN":
-        contagem_regressiva()
-        continue
+    def marcar(self, fase):
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        self.atual[fase] += (agora - self.ultima_marca) * 1000
+        self.ultima_marca = agora
 
-    if estado_jogo == "GAME_OVER":
-        tela_game_over(pontos)
-        continue
+    def fechar_quadro(self):
+        if not self.ativo:
+            return
+        total = (time.perf_counter() - self.inicio_quadro) * 1000
+        for fase, ms in self.atual.items():
+            self.historico[fase].append(ms)
+        self.historico['total'].append(total)
+        self.contagens = {
+            'inimigos': len(inimigos), 'tiros': len(tiros), 'tiros_chefao': len(tiros_chefao),
+            'explosoes': len(explosoes), 'powerups': len(powerups),
+        }
+        if self.escritor_csv is not None:
+            self.escritor_csv.writerow([self.quadro, f"{total:.3f}"] + [f"{self.atual[f]:.3f}" for f in self.FASES]
+                                       + [self.contagens[g] for g in self.GRUPOS])
+        self.quadro += 1
+        # O texto do overlay muda pouco de um quadro para o outro; refazer a cada meio segundo basta
+        if self.visivel and self.quadro % 30 == 1:
+            self.linhas_overlay = self.montar_linhas()
+
+    @staticmethod
+    def p99(valores):
+        if not valores:
+            return 0.0
+        ordenados = sorted(valores)
+        return ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.99))]
+
+    def montar_linhas(self):
+        linhas = []
+        for fase in ['total'] + self.FASES:
+            valores = self.historico[fase]
+            media = sum(valores) / len(valores) if valores else 0.0
+            linhas.append(f"{fase:<9} {media:6.2f} ms  p99 {self.p99(valores):6.2f}")
+        linhas.append(" ".join(f"{g}={n}" for g, n in self.contagens.items()))
+        return linhas
+
+    def alternar(self):
+        self.visivel = not self.visivel
+        if self.visivel:
+            self.linhas_overlay = self.montar_linhas()
+
+    def desenhar(self, superficie):
+        area = pygame.Rect(10, 40, 330, 16 * len(self.linhas_overlay) + 8)
+        if self.fundo_overlay is None or self.fundo_overlay.get_size() != area.size:
+            self.fundo_overlay = pygame.Surface(area.size)
+            self.fundo_overlay.set_alpha(170)
+        superficie.blit(self.fundo_overlay, area)
+        for i, linha in enumerate(self.linhas_overlay):
+            superficie.blit(render_texto(linha, (0, 255, 0), 18), (area.x + 4, area.y + 4 + 16 * i))
+        return area
+
+perfilador = Perfilador()
+
+def processar_eventos_jogo():
+    global estado_jogo, rodando
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             rodando = False
 
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            perfilador.alternar()
+
         if estado_jogo in ["NORMAL", "BOSS"]:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 estado_jogo = "PAUSED"
@@ -753,146 +2048,334 @@ while rodando:
                     play_sfx('clique_botao')
                     estado_jogo = "PAUSED"
 
-        if estado_jogo == "WIN":
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
-                reset_game_state()
-                estado_jogo = "COUNTDOWN"
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                reset_game_state()
-                estado_jogo = "MENU"
-
-    if estado_jogo in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
-        keys = pygame.key.get_pressed()
-        delay_tiro += 0.2
-        if keys[pygame.K_SPACE]:
-            delay_tiro_ajustado = 2 if jogador.transformado else 4
-            if delay_tiro >= delay_tiro_ajustado:
-                play_sfx('tiro')
-                if tempo_tirotriplo > 0 or jogador.transformado:
-                    t1 = Tiro(jogador.rect.centerx, jogador.rect.y)
-                    t2 = TiroDiagonal(jogador.rect.centerx, jogador.rect.y, -1)
-                    t3 = TiroDiagonal(jogador.rect.centerx, jogador.rect.y, 1)
-                    for t in (t1, t2, t3):
-                        todos_sprites.add(t); tiros.add(t)
-                else:
-                    t = Tiro(jogador.rect.centerx, jogador.rect.y)
-                    todos_sprites.add(t); tiros.add(t)
-                delay_tiro = 0
-
-        if pontos >= 50 and estado_jogo == "NORMAL":
-            estado_jogo = "BOSS_INCOMING"
-            play_sfx('chegada_chefao')
-            play_music('trilha_boss')
-            aviso_timer = FPS * 2
-
-        if estado_jogo == "BOSS_INCOMING":
-            aviso_timer -= 1
-            if aviso_timer <= 0:
-                estado_jogo = "BOSS"
-                chefao = Boss(LARGURA // 2, 120)
-                todos_sprites.add(chefao)
-
-        if estado_jogo == "BOSS":
-            if chefao:
-                chefao.delay_tiro += 1
-                
-                if chefao.delay_tiro >= 45: 
-                    
-                    if (chefao.delay_tiro % 10) == 0 and chefao.delay_tiro <= 65:
-                        t = BossTiro(chefao.rect.centerx, chefao.rect.bottom + 5, jogador.rect.center)
-                        tiros_chefao.add(t); todos_sprites.add(t)
-
-                    if chefao.delay_tiro >= 70:
-                        chefao.delay_tiro = 0 
-
-        if estado_jogo == "NORMAL":
-            spawn_timer += 1
-            if spawn_timer > 60:
-                rand = random.random()
-                x_pos = random.randint(50, LARGURA - 50)
-
-                if rand < 0.15 and not jogador.transformado and not jogador.cacador_desabilitado:
-                    robo = RoboCacador(x_pos, -50)
-                elif rand < 0.30:
-                    robo = RoboCircular(x_pos, -50, raio=random.randint(20, 60), v_descida=1, v_angular=random.uniform(3, 6))
-                elif rand < 0.45:
-                    robo = RoboPulante(x_pos, -50)
-                elif rand < 0.60:
-                    robo = RoboRapido(x_pos, -50)
-                elif rand < 0.75:
-                    robo = RoboLento(x_pos, -50)
-                else:
-                    robo = RoboZigueZague(x_pos, -50)
-
-                todos_sprites.add(robo)
-                inimigos.add(robo)
-                spawn_timer = 0
-
-            if random.random() < 0.005 and not jogador.transformado:
-                tipo = random.choice(["vida", "velocidade", "tirotriplo"])
-                r = PowerUp(random.randint(40, LARGURA - 40), -40, tipo)
-                todos_sprites.add(r)
-                powerups.add(r)
-
-        for p in pygame.sprite.spritecollide(jogador, powerups, True):
-            play_sfx('power_up')
-            if p.tipo == "vida":
-                jogador.vida += 1
-            elif p.tipo == "velocidade":
-                jogador.velocidade = 10
-                tempo_velocidade = FPS * 5
-            elif p.tipo == "tirotriplo":
-                tempo_tirotriplo = FPS * 5
- 
-        colisoes = pygame.sprite.groupcollide(inimigos, tiros, False, True)
-        for inimigo, lista_tiros in colisoes.items():
-            
-            if isinstance(inimigo, Boss):
-               
-                for t in lista_tiros:
-                    tiros.add(t); todos_sprites.add(t)
-                continue
+CLASSES_ROBO = {
+    'cacador': RoboCacador,
+    'circular': RoboCircular,
+    'pulante': RoboPulante,
+    'rapido': RoboRapido,
+    'lento': RoboLento,
+    'zigue': RoboZigueZague,
+}
 
+def criar_robo(tipo, x, y):
+    if tipo == 'circular':
+        return RoboCircular(x, y, raio=rng.randint(20, 60), v_descida=1, v_angular=rng.uniform(3, 6))
+    return CLASSES_ROBO[tipo](x, y)
+
+class TabelaPesos:
+    # Sorteio ponderado em O(log n): busca binária sobre os pesos acumulados
+    def __init__(self, itens, acumulados):
+        self.itens = list(itens)
+        self.acumulados = list(acumulados)
+        if not self.itens or self.acumulados[-1] <= 0:
+            raise ValueError("TabelaPesos precisa de ao menos um item com peso positivo")
+        self.total = self.acumulados[-1]
+
+    @classmethod
+    def de_pesos(cls, pesos):
+        itens = [item for item, peso in pesos if peso > 0]
+        return cls(itens, itertools.accumulate(peso for _, peso in pesos if peso > 0))
+
+    def sortear(self):
+        # Com um item só não gasta sorteio, para não mexer na sequência do rng
+        if len(self.itens) == 1:
+            return self.itens[0]
+        return self.itens[bisect.bisect_right(self.acumulados, rng.random() * self.total)]
+
+FORMACOES = ('unico', 'linha', 'coluna', 'v', 'espalhada')
+
+def posicoes_formacao(formacao, x, y):
+    tipo, n, espaco = formacao['tipo'], formacao['quantidade'], formacao['espaco']
+    if tipo == 'unico':
+        return [(x, y)]
+    if tipo == 'coluna':
+        return [(x, y - i * espaco) for i in range(n)]
+    if tipo == 'espalhada':
+        return [(rng.randint(50, LARGURA - 50), y - rng.randint(0, espaco)) for _ in range(n)]
+    # linha e v: centralizadas em x, empurradas para dentro da tela se não couberem
+    meio = (n - 1) / 2
+    x = max(50 + meio * espaco, min(x, LARGURA - 50 - meio * espaco))
+    if tipo == 'linha':
+        return [(round(x + (i - meio) * espaco), y) for i in range(n)]
+    return [(round(x + (i - meio) * espaco), round(y - abs(i - meio) * espaco / 2)) for i in range(n)]
+
+class Onda:
+    def __init__(self, nome, duracao, intervalo, densidade, tipos, formacoes, intervalo_final=None, densidade_final=None):
+        self.nome = nome
+        self.duracao = duracao
+        self.intervalo = intervalo
+        self.densidade = densidade
+        self.intervalo_final = intervalo if intervalo_final is None else intervalo_final
+        self.densidade_final = densidade if densidade_final is None else densidade_final
+        self.tipos = tipos
+        self.formacoes = formacoes
+
+    def rampa(self, inicio, fim, tick):
+        if self.duracao is None or inicio == fim:
+            return inicio
+        return round(inicio + (fim - inicio) * min(1.0, tick / self.duracao))
+
+class AgendadorOndas:
+    # Decide quando e quais robôs nascem no estado NORMAL. Sem arquivo, a única onda é a do jogo
+    # original, montada de FAIXAS_SPAWN e INTERVALO_SPAWN; com --ondas, lê as ondas de um JSON:
+    #   {"repetir": false, "ondas": [{"nome": ..., "duracao": segundos, "intervalo": ticks,
+    #     "densidade": formações por spawn, "rampa": {"intervalo": ..., "densidade": ...},
+    #     "robos": {"lento": peso, ...},
+    #     "formacoes": [{"tipo": "linha", "quantidade": 5, "espaco": 60, "peso": 1}, ...]}]}
+    # As ondas são compiladas em TabelaPesos a cada partida; a rampa vai do início ao fim da onda.
+    # Depois da última, repete tudo ("repetir": true) ou fica na última com os valores finais.
+    def __init__(self):
+        self.definicao = None
+        self.ondas = []
+        self.repetir = False
+        self.reiniciar()
+
+    def carregar(self, caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            definicao = json.load(arquivo)
+        ondas = definicao.get('ondas')
+        if not ondas:
+            raise ValueError(f"{caminho}: nenhuma onda definida")
+        for i, onda in enumerate(ondas):
+            nome = onda.get('nome', f"onda {i + 1}")
+            desconhecidos = set(onda.get('robos', {})) - set(CLASSES_ROBO)
+            if desconhecidos:
+                raise ValueError(f"{caminho}: {nome}: robôs desconhecidos {sorted(desconhecidos)}")
+            if not onda.get('robos'):
+                raise ValueError(f"{caminho}: {nome}: precisa de ao menos um robô")
+            for robo, peso in onda['robos'].items():
+                self.validar_peso(caminho, nome, f"robô {robo}", peso)
+            for formacao in onda.get('formacoes', []):
+                if formacao.get('tipo') not in FORMACOES:
+                    raise ValueError(f"{caminho}: {nome}: formação desconhecida {formacao.get('tipo')!r}")
+                self.validar_peso(caminho, nome, f"formação {formacao['tipo']}", formacao.get('peso', 1))
+        self.definicao = definicao
+        self.reiniciar()
+
+    @staticmethod
+    def validar_peso(caminho, nome, item, peso):
+        # Peso zero ou negativo deixaria o total da TabelaPesos sem sentido no meio da partida
+        if isinstance(peso, bool) or not isinstance(peso, (int, float)) or not peso > 0:
+            raise ValueError(f"{caminho}: {nome}: peso de {item} precisa ser um número positivo, veio {peso!r}")
+
+    def compilar(self, i, onda):
+        rampa = onda.get('rampa', {})
+        formacoes = onda.get('formacoes') or [{'tipo': 'unico'}]
+        return Onda(
+            nome=onda.get('nome', f"onda {i + 1}"),
+            duracao=round(onda['duracao'] * TICKS_POR_SEGUNDO) if onda.get('duracao') else None,
+            intervalo=onda.get('intervalo', INTERVALO_SPAWN),
+            densidade=onda.get('densidade', 1),
+            intervalo_final=rampa.get('intervalo'),
+            densidade_final=rampa.get('densidade'),
+            tipos=TabelaPesos.de_pesos(list(onda['robos'].items())),
+            formacoes=TabelaPesos.de_pesos([
+                ({'tipo': f['tipo'], 'quantidade': f.get('quantidade', 1), 'espaco': f.get('espaco', 60)}, f.get('peso', 1))
+                for f in formacoes
+            ]),
+        )
+
+    def reiniciar(self):
+        if self.definicao is None:
+            # FAIXAS_SPAWN já são os pesos acumulados; o que sobra até 1.0 é do zigue-zague
+            tipos = TabelaPesos(CLASSES_ROBO, FAIXAS_SPAWN + (1.0,))
+            formacoes = TabelaPesos([{'tipo': 'unico', 'quantidade': 1, 'espaco': 0}], [1])
+            self.ondas = [Onda('padrão', None, INTERVALO_SPAWN, 1, tipos, formacoes)]
+            self.repetir = False
+        else:
+            self.ondas = [self.compilar(i, onda) for i, onda in enumerate(self.definicao['ondas'])]
+            self.repetir = self.definicao.get('repetir', False)
+        self.indice = 0
+        self.tick_onda = 0
+        self.contador = 0
+
+    def onda_atual(self):
+        return self.ondas[self.indice]
+
+    def sortear_tipo(self, onda):
+        # Caçador indisponível (jogador transformado) cede a vez ao próximo da tabela
+        tipos = onda.tipos
+        tipo = tipos.sortear()
+        if tipo == 'cacador' and (jogador.transformado or jogador.cacador_desabilitado):
+            tipo = tipos.itens[(tipos.itens.index(tipo) + 1) % len(tipos.itens)]
+            if tipo == 'cacador':
+                return None
+        return tipo
+
+    def sortear_formacao(self, onda, y=-50):
+        tipo = self.sortear_tipo(onda)
+        formacao = onda.formacoes.sortear()
+        if tipo is None:
+            return []
+        x = rng.randint(50, LARGURA - 50)
+        return [criar_robo(tipo, px, py) for px, py in posicoes_formacao(formacao, x, y)]
+
+    def atualizar(self):
+        # Chamado a cada tick do estado NORMAL; devolve os robôs que nascem neste tick
+        onda = self.ondas[self.indice]
+        robos = []
+        self.contador += 1
+        if self.contador > onda.rampa(onda.intervalo, onda.intervalo_final, self.tick_onda):
+            for _ in range(onda.rampa(onda.densidade, onda.densidade_final, self.tick_onda)):
+                robos += self.sortear_formacao(onda)
+            self.contador = 0
+
+        self.tick_onda += 1
+        if onda.duracao is not None and self.tick_onda >= onda.duracao:
+            if self.indice + 1 < len(self.ondas):
+                self.indice += 1
+                self.tick_onda = 0
+            elif self.repetir:
+                self.indice = 0
+                self.tick_onda = 0
+            else:
+                self.tick_onda = onda.duracao
+        return robos
+
+agendador = AgendadorOndas()
+
+def sortear_robo(y=-50):
+    # Um robô avulso com a mistura de robôs da onda atual
+    tipo = agendador.sortear_tipo(agendador.onda_atual()) or 'zigue'
+    return criar_robo(tipo, rng.randint(50, LARGURA - 50), y)
+
+def atualizar_simulacao(keys):
+    global estado_jogo, chefao, pontos, delay_tiro, tempo_velocidade, tempo_tirotriplo, aviso_timer, cacador_ja_conhecido
+
+    jogador.teclas = keys
+    delay_tiro += 0.2
+    if keys[pygame.K_SPACE]:
+        delay_tiro_ajustado = 2 if jogador.transformado else 4
+        if delay_tiro >= delay_tiro_ajustado:
+            play_sfx('tiro')
+            if tempo_tirotriplo > 0 or jogador.transformado:
+                t1 = pool_sprites.obter(Tiro, jogador.rect.centerx, jogador.rect.y)
+                t2 = pool_sprites.obter(TiroDiagonal, jogador.rect.centerx, jogador.rect.y, -1)
+                t3 = pool_sprites.obter(TiroDiagonal, jogador.rect.centerx, jogador.rect.y, 1)
+                for t in (t1, t2, t3):
+                    cena.adicionar(t, tiros)
+            else:
+                t = pool_sprites.obter(Tiro, jogador.rect.centerx, jogador.rect.y)
+                cena.adicionar(t, tiros)
+            delay_tiro = 0
+    perfilador.marcar('entrada')
+
+    if pontos >= 50 and estado_jogo == "NORMAL":
+        estado_jogo = "BOSS_INCOMING"
+        sprites.antecipar('boss', 'boss_tiro')
+        play_sfx('chegada_chefao')
+        musica.tocar('trilha_boss', fade_ms=1500)
+        aviso_timer = TICKS_POR_SEGUNDO * 2
+
+    if estado_jogo == "BOSS_INCOMING":
+        aviso_timer -= 1
+        if aviso_timer <= 0:
+            estado_jogo = "BOSS"
+            chefao = Boss(LARGURA // 2, 120)
+            cena.adicionar(chefao)
+
+    if estado_jogo == "BOSS":
+        if chefao:
+            chefao.delay_tiro += 1
+            inicio_rajada, intervalo_rajada, fim_rajada, ciclo_rajada = RAJADA_CHEFAO
             
-            explos = Explosao(inimigo.rect.centerx, inimigo.rect.centery)
-            explosoes.add(explos); todos_sprites.add(explos)
-            pontos += 1
-            if random.random() < 0.10:
-                tipo = random.choice(["vida", "velocidade", "tirotriplo"])
-                p = PowerUp(inimigo.rect.centerx, inimigo.rect.centery, tipo)
-                powerups.add(p); todos_sprites.add(p)
+            if chefao.delay_tiro >= inicio_rajada: 
+                
+                if (chefao.delay_tiro % intervalo_rajada) == 0 and chefao.delay_tiro <= fim_rajada:
+                    t = pool_sprites.obter(BossTiro, chefao.rect.centerx, chefao.rect.bottom + 5, jogador.rect.center)
+                    cena.adicionar(t, tiros_chefao)
+
+                if chefao.delay_tiro >= ciclo_rajada:
+                    chefao.delay_tiro = 0
+    perfilador.marcar('chefao')
+
+    if estado_jogo == "NORMAL":
+        for robo in agendador.atualizar():
+            cena.adicionar(robo, inimigos)
+
+        if rng.random() < CHANCE_POWERUP and not jogador.transformado:
+            tipo = rng.choice(["vida", "velocidade", "tirotriplo"])
+            r = pool_sprites.obter(PowerUp, rng.randint(40, LARGURA - 40), -40, tipo)
+            cena.adicionar(r, powerups)
+    perfilador.marcar('spawn')
+
+    # Só os tiros são consultados por um grupo inteiro (cada robô); inimigos, power-ups e tiros do
+    # chefão só são consultados pelo jogador, e uma consulta isolada sai mais barata direto no spritecollide
+    grade_colisao.reconstruir(tiros)
+
+    for p in grade_colisao.colidindo(jogador, powerups, True):
+        play_sfx('power_up')
+        if p.tipo == "vida":
+            jogador.vida += 1
+        elif p.tipo == "velocidade":
+            jogador.velocidade = 10
+            tempo_velocidade = TICKS_POR_SEGUNDO * 5
+        elif p.tipo == "tirotriplo":
+            tempo_tirotriplo = TICKS_POR_SEGUNDO * 5
+    perfilador.marcar('powerups')
+
+    colisoes = grade_colisao.colisoes_grupos(inimigos, tiros, False, True)
+    for inimigo, lista_tiros in colisoes.items():
+        
+        if isinstance(inimigo, Boss):
+           
+            for t in lista_tiros:
+                cena.adicionar(t, tiros)
+            continue
+
+        
+        explos = pool_sprites.obter(Explosao, inimigo.rect.centerx, inimigo.rect.centery)
+        cena.adicionar(explos, explosoes)
+        pontos += 1
+        if rng.random() < CHANCE_DROP:
+            tipo = rng.choice(["vida", "velocidade", "tirotriplo"])
+            p = pool_sprites.obter(PowerUp, inimigo.rect.centerx, inimigo.rect.centery, tipo)
+            cena.adicionar(p, powerups)
+        inimigo.kill()
+    perfilador.marcar('colisoes')
+
+    if chefao:
+        tiros_acertaram = grade_colisao.colidindo(chefao, tiros, True)
+        
+        for tiro in tiros_acertaram:
+            chefao.vida -= 1
+
+            if rng.random() < CHANCE_DROP: 
+                tipo = rng.choice(["vida", "velocidade", "tirotriplo"])
+                p = pool_sprites.obter(PowerUp, chefao.rect.centerx, chefao.rect.centery, tipo)
+                cena.adicionar(p, powerups)
+                
+        if chefao.vida <= 0:
+            chefao.kill()
+            chefao = None
+            estado_jogo = "WIN"
+            play_sfx('morte_chefao')
+            musica.parar()
+            pontos += 50
+    perfilador.marcar('chefao')
+
+    colisao_cacador = grade_colisao.colidindo(jogador, inimigos, False)
+    for inimigo in list(colisao_cacador):
+        if isinstance(inimigo, RoboCacador) and not jogador.transformado:
+            play_sfx('transformacao_easter_egg')
+            jogador.ativar_transformacao()
+            inimigo.kill()
+            cacador_ja_conhecido = True
+        elif isinstance(inimigo, RoboCacador) and jogador.transformado:
             inimigo.kill()
 
-        if chefao:
-            tiros_acertaram = pygame.sprite.spritecollide(chefao, tiros, True)
-            
-            for tiro in tiros_acertaram:
-                chefao.vida -= 1
-
-                if random.random() < 0.10: 
-                    tipo = random.choice(["vida", "velocidade", "tirotriplo"])
-                    p = PowerUp(chefao.rect.centerx, chefao.rect.centery, tipo)
-                    powerups.add(p); todos_sprites.add(p)
-                    
-            if chefao.vida <= 0:
-                chefao.kill()
-                chefao = None
-                estado_jogo = "WIN"
-                play_sfx('morte_chefao')
-                stop_music()
-                pontos += 50
-
-        colisao_cacador = pygame.sprite.spritecollide(jogador, inimigos, False)
-        for inimigo in list(colisao_cacador):
-            if isinstance(inimigo, RoboCacador) and not jogador.transformado:
-                play_sfx('transformacao_easter_egg')
-                jogador.ativar_transformacao()
-                inimigo.kill()
-                cacador_ja_conhecido = True
-            elif isinstance(inimigo, RoboCacador) and jogador.transformado:
-                inimigo.kill()
-
-        if pygame.sprite.spritecollide(jogador, tiros_chefao, True):
+    if grade_colisao.colidindo(jogador, tiros_chefao, True):
+        jogador.vida -= 1
+        if jogador.transformado:
+            play_sfx('perca_easter_egg')
+            jogador.desativar_transformacao()
+            cacador_ja_conhecido = False
+        if jogador.vida <= 0:
+            estado_jogo = "GAME_OVER"
+    
+    colisao_inimigos = grade_colisao.colidindo(jogador, inimigos, True)
+    for inimigo in colisao_inimigos:
+        if not isinstance(inimigo, RoboCacador):
             jogador.vida -= 1
             if jogador.transformado:
                 play_sfx('perca_easter_egg')
@@ -900,106 +2383,479 @@ while rodando:
                 cacador_ja_conhecido = False
             if jogador.vida <= 0:
                 estado_jogo = "GAME_OVER"
+    perfilador.marcar('colisoes')
+
+    if tempo_velocidade > 0:
+        tempo_velocidade -= 1
+        if tempo_velocidade == 0:
+            jogador.velocidade = jogador.velocidade_original
+    
+    if tempo_tirotriplo > 0:
+        tempo_tirotriplo -= 1
         
-        colisao_inimigos = pygame.sprite.spritecollide(jogador, inimigos, True)
-        for inimigo in colisao_inimigos:
-            if not isinstance(inimigo, RoboCacador):
-                jogador.vida -= 1
-                if jogador.transformado:
-                    play_sfx('perca_easter_egg')
-                    jogador.desativar_transformacao()
-                    cacador_ja_conhecido = False
-                if jogador.vida <= 0:
-                    estado_jogo = "GAME_OVER"
-
-        if tempo_velocidade > 0:
-            tempo_velocidade -= 1
-            if tempo_velocidade == 0:
-                jogador.velocidade = jogador.velocidade_original
-        
-        if tempo_tirotriplo > 0:
-            tempo_tirotriplo -= 1
-            
-        todos_sprites.update()
-        tiros_chefao.update()
-        explosoes.update()
+    cena.atualizar()
+    perfilador.marcar('update')
 
-    if estado_jogo in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
-        if jogador.transformado:
-            fundo_mod = fundo.copy()
-            overlay = pygame.Surface((LARGURA, ALTURA))
-            overlay.fill((0, 40, 40))
-            overlay.set_alpha(120)
-            fundo_mod.blit(overlay, (0, 0))
-            TELA.blit(fundo_mod, (0, 0))
-        else:
-            TELA.blit(fundo, (0, 0))
+    descarte.executar()
+    perfilador.marcar('descarte')
 
-        todos_sprites.draw(TELA)
-        explosoes.draw(TELA)
+def fundo_do_jogo():
+    if jogador.transformado:
+        return fundo_tingido(*TINTA_TRANSFORMADO)
+    return fundo
 
-        TELA.blit(sprites['pause_button_sprite'], pause_rect)
+alpha_interpolacao = 1.0
 
-        if estado_jogo == "BOSS_INCOMING":
-            cor_aviso = (255, 0, 0) 
-            
-            if (aviso_timer // 10) % 2 == 0:
-                 cor_aviso = (255, 255, 0) 
-            
-            font_aviso = pygame.font.SysFont(None, 100, bold=True)
-            texto_principal = "BOSS CHEGANDO!" 
-            
-            sombra_aviso = font_aviso.render(texto_principal, True, (0, 0, 0))
-            TELA.blit(sombra_aviso, (LARGURA // 2 - sombra_aviso.get_width() // 2 + 3, ALTURA // 2 - 40 + 3))
-            
-            texto_aviso = font_aviso.render(texto_principal, True, cor_aviso)
-            TELA.blit(texto_aviso, (LARGURA // 2 - texto_aviso.get_width() // 2, ALTURA // 2 - 40))
-
-        if estado_jogo == "BOSS" and chefao:
-            barra_w = 300  
-            barra_h = 20    
-            barra_x = LARGURA // 2 - barra_w // 2 
-            barra_y = 10
-            
-            pygame.draw.rect(TELA, (0, 0, 0), (barra_x, barra_y, barra_w, barra_h))
-            pygame.draw.rect(TELA, (255, 0, 0), (barra_x, barra_y, barra_w, barra_h), 3) 
-            
-            vida_atual_w = int((chefao.vida / 100) * barra_w)
-            
-            cor_vida = (0, 255, 0) 
-            if chefao.vida < 50:
-                 cor_vida = (255, 255, 0) 
-            if chefao.vida < 20:
-                 cor_vida = (255, 0, 0) 
-                 
-            pygame.draw.rect(TELA, cor_vida, (barra_x, barra_y, vida_atual_w, barra_h))
-            
-            font_boss = pygame.font.SysFont(None, 24, bold=True)
-            texto_vida = font_boss.render(f"BOSS (HP: {chefao.vida})", True, (255, 255, 255))
-            TELA.blit(texto_vida, (LARGURA // 2 - texto_vida.get_width() // 2, barra_y + 3))
+def guardar_posicoes_anteriores():
+    # Posições antes do próximo tick, para desenhar entre um tick e outro
+    global posicoes_anteriores
+    posicoes_anteriores = {s: s.rect.topleft for s in cena.todos()}
 
-        font = pygame.font.SysFont(None, 30)
-        texto = font.render(f"Vida: {jogador.vida} | Pontos: {pontos}", True, (255, 255, 255))
-        TELA.blit(texto, (10, 10))
-        
-    elif estado_jogo == "PAUSED":
-        menu_pausa()
+def posicao_interpolada(sprite):
+    rect = sprite.rect
+    anterior = posicoes_anteriores.get(sprite)
+    if anterior is None or alpha_interpolacao >= 1.0:
+        return rect
+    ax, ay = anterior
+    return (round(ax + (rect.x - ax) * alpha_interpolacao), round(ay + (rect.y - ay) * alpha_interpolacao))
 
-    elif estado_jogo == "WIN":
-        TELA.blit(fundo, (0, 0))
+def desenhar_cena():
+    # Desenha tudo o que fica por cima do fundo e devolve os rects tocados
+    rects = cena.desenhar(TELA)
+    perfilador.marcar('sprites')
+
+    rects.append(TELA.blit(sprites['pause_button_sprite'], pause_rect))
+
+    if estado_jogo == "BOSS_INCOMING":
+        cor_aviso = (255, 0, 0) 
         
-        font_titulo = pygame.font.SysFont(None, 120, bold=True)
-        font_sub = pygame.font.SysFont(None, 40)
-        titulo = font_titulo.render("VITÓRIA!", True, (0, 255, 0))
-        score_text = font_sub.render(f"Pontuação Total: {pontos}", True, (255, 255, 255))
-        instrucao = font_sub.render("Pressione ENTER para Recomeçar ou ESC para Menu", True, (150, 150, 150))
+        if (aviso_timer // 10) % 2 == 0:
+             cor_aviso = (255, 255, 0) 
         
-        TELA.blit(titulo, (LARGURA // 2 - titulo.get_width() // 2, ALTURA // 3))
-        TELA.blit(score_text, (LARGURA // 2 - score_text.get_width() // 2, ALTURA // 2))
-        TELA.blit(instrucao, (LARGURA // 2 - instrucao.get_width() // 2, ALTURA * 2 // 3))
+        texto_principal = "BOSS CHEGANDO!" 
         
-    
-    pygame.display.flip()
+        sombra_aviso = render_texto(texto_principal, (0, 0, 0), 100, bold=True)
+        rects.append(TELA.blit(sombra_aviso, (LARGURA // 2 - sombra_aviso.get_width() // 2 + 3, ALTURA // 2 - 40 + 3)))
+        
+        texto_aviso = render_texto(texto_principal, cor_aviso, 100, bold=True)
+        rects.append(TELA.blit(texto_aviso, (LARGURA // 2 - texto_aviso.get_width() // 2, ALTURA // 2 - 40)))
+
+    if estado_jogo == "BOSS" and chefao:
+        barra_w = 300  
+        barra_h = 20    
+        barra_x = LARGURA // 2 - barra_w // 2 
+        barra_y = 10
+        
+        rects.append(pygame.draw.rect(TELA, (0, 0, 0), (barra_x, barra_y, barra_w, barra_h)))
+        pygame.draw.rect(TELA, (255, 0, 0), (barra_x, barra_y, barra_w, barra_h), 3) 
+        
+        vida_atual_w = int((chefao.vida / VIDA_CHEFAO) * barra_w)
+        
+        cor_vida = (0, 255, 0) 
+        if chefao.vida < VIDA_CHEFAO * 0.5:
+             cor_vida = (255, 255, 0) 
+        if chefao.vida < VIDA_CHEFAO * 0.2:
+             cor_vida = (255, 0, 0) 
+             
+        pygame.draw.rect(TELA, cor_vida, (barra_x, barra_y, vida_atual_w, barra_h))
+        
+        texto_vida = render_texto(f"BOSS (HP: {chefao.vida})", (255, 255, 255), 24, bold=True)
+        rects.append(TELA.blit(texto_vida, (LARGURA // 2 - texto_vida.get_width() // 2, barra_y + 3)))
+
+    texto = render_texto(f"Vida: {jogador.vida} | Pontos: {pontos}", (255, 255, 255), 30)
+    rects.append(TELA.blit(texto, (10, 10)))
+    if perfilador.visivel:
+        rects.append(perfilador.desenhar(TELA))
+    perfilador.marcar('hud')
+    return rects
+
+def desenhar_jogo():
+    TELA.blit(fundo_do_jogo(), (0, 0))
+    perfilador.marcar('fundo')
+    desenhar_cena()
+
+class RenderizadorSujo:
+    # Modo de desenho por retângulos sujos: apaga com o fundo só onde algo foi desenhado
+    # no quadro anterior, redesenha a cena e envia à tela só essas áreas com display.update.
+    # Volta ao quadro inteiro quando o fundo muda ou quando a área suja passa do limite.
+    def __init__(self, limite_area=0.5):
+        self.limite_area = limite_area * LARGURA * ALTURA
+        self.rects_anteriores = []
+        self.fundo_anterior = None
+        self.mascara = pygame.mask.Mask((LARGURA, ALTURA))
+        self.mascaras_cheias = {}
+
+    def invalidar(self):
+        self.fundo_anterior = None
+
+    def area_suja(self, rects):
+        # A soma das áreas é um teto (sprites agrupados se sobrepõem); só quando ela passa do
+        # limite vale contar a área de fato coberta, pintando os rects numa máscara da tela
+        soma = sum(r.width * r.height for r in rects)
+        if soma <= self.limite_area:
+            return soma
+        self.mascara.clear()
+        for r in rects:
+            if r.width > 0 and r.height > 0:
+                cheia = self.mascaras_cheias.get(r.size)
+                if cheia is None:
+                    cheia = self.mascaras_cheias[r.size] = pygame.mask.Mask(r.size, fill=True)
+                self.mascara.draw(cheia, r.topleft)
+        return self.mascara.count()
+
+    def desenhar(self):
+        fundo_atual = fundo_do_jogo()
+
+        if fundo_atual is not self.fundo_anterior or self.area_suja(self.rects_anteriores) > self.limite_area:
+            TELA.blit(fundo_atual, (0, 0))
+            perfilador.marcar('fundo')
+            self.rects_anteriores = desenhar_cena()
+            self.fundo_anterior = fundo_atual
+            pygame.display.flip()
+            perfilador.marcar('flip')
+            return
 
-pygame.quit()
-sys.exit()
+        for r in self.rects_anteriores:
+            TELA.blit(fundo_atual, r, r)
+        perfilador.marcar('fundo')
+        rects = desenhar_cena()
+        pygame.display.update(self.rects_anteriores + rects)
+        perfilador.marcar('flip')
+        self.rects_anteriores = rects
+
+# Desenho parcial opcional (ROBOT_DEFENSE_RENDER_PARCIAL=1 ou --render-parcial), para máquinas fracas
+USAR_RENDER_PARCIAL = os.environ.get("ROBOT_DEFENSE_RENDER_PARCIAL") == "1" or "--render-parcial" in sys.argv
+renderizador_sujo = RenderizadorSujo() if USAR_RENDER_PARCIAL else None
+
+def tela_vitoria():
+    desenhar_tela_final(fundo, "VITÓRIA!", (0, 255, 0), f"Pontuação Total: {pontos}")
+    esperar_escolha_final("WIN")
+
+class TeclasSimuladas:
+    # Substitui pygame.key.get_pressed() quando a simulação roda sem janela
+    def __init__(self, pressionadas=()):
+        self.pressionadas = set(pressionadas)
+
+    def __getitem__(self, tecla):
+        return tecla in self.pressionadas
+
+SEM_TECLAS = TeclasSimuladas()
+
+# Teclas que a simulação lê, na ordem dos bits da máscara gravada no replay
+TECLAS_REPLAY = [pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_SPACE]
+TECLAS_POR_MASCARA = [
+    TeclasSimuladas(t for bit, t in enumerate(TECLAS_REPLAY) if mascara & (1 << bit))
+    for mascara in range(1 << len(TECLAS_REPLAY))
+]
+
+def mascara_de_teclas(keys):
+    mascara = 0
+    for bit, tecla in enumerate(TECLAS_REPLAY):
+        if keys[tecla]:
+            mascara |= 1 << bit
+    return mascara
+
+class GravadorReplay:
+    # Formato: cabeçalho fixo (REPLAY_CABECALHO) com semente, ticks e o resultado final para
+    # conferência, seguido das máscaras de teclas por tick em RLE: (máscara u8, repetições varint).
+    # Cada partida nova sobrescreve o arquivo; partidas sem nenhum tick não são gravadas.
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self.semente = 0
+        self.corridas = []
+
+    def iniciar(self, semente):
+        self.finalizar()
+        self.semente = semente
+        self.corridas = []
+
+    def registrar(self, mascara):
+        if self.caminho is None:
+            return
+        if self.corridas and self.corridas[-1][0] == mascara:
+            self.corridas[-1][1] += 1
+        else:
+            self.corridas.append([mascara, 1])
+
+    def finalizar(self):
+        if self.caminho is None or not self.corridas:
+            return
+        salvar_replay(self.caminho, self.semente, self.corridas, pontos, jogador.vida)
+        self.corridas = []
+
+gravador = GravadorReplay()
+
+REPLAY_MAGICO = b'RDRP'
+REPLAY_CABECALHO = struct.Struct('<4sBQIii')
+
+def _escrever_varint(saida, valor):
+    while True:
+        byte = valor & 0x7F
+        valor >>= 7
+        if valor:
+            saida.append(byte | 0x80)
+        else:
+            saida.append(byte)
+            return
+
+def salvar_replay(caminho, semente, corridas, pontos_finais, vida_final):
+    ticks = sum(n for _, n in corridas)
+    dados = bytearray(REPLAY_CABECALHO.pack(REPLAY_MAGICO, 1, semente, ticks, pontos_finais, vida_final))
+    for mascara, n in corridas:
+        dados.append(mascara)
+        _escrever_varint(dados, n)
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(dados)
+
+def carregar_replay(caminho):
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+    magico, versao, semente, ticks, pontos_finais, vida_final = REPLAY_CABECALHO.unpack_from(dados)
+    if magico != REPLAY_MAGICO or versao != 1:
+        raise ValueError(f"{caminho} não é um replay válido")
+    mascaras = bytearray()
+    i = REPLAY_CABECALHO.size
+    while i < len(dados):
+        mascara = dados[i]
+        i += 1
+        n = deslocamento = 0
+        while True:
+            byte = dados[i]
+            i += 1
+            n |= (byte & 0x7F) << deslocamento
+            deslocamento += 7
+            if not byte & 0x80:
+                break
+        mascaras += bytes([mascara]) * n
+    return {"semente": semente, "ticks": ticks, "pontos": pontos_finais, "vida": vida_final, "mascaras": mascaras}
+
+def reproduzir_replay(caminho):
+    # Re-simula a partida gravada sem janela e o mais rápido possível, medindo cada tick
+    global estado_jogo
+    replay = carregar_replay(caminho)
+    reset_game_state(replay["semente"])
+    estado_jogo = "NORMAL"
+
+    tempos = []
+    for mascara in replay["mascaras"]:
+        inicio = time.perf_counter()
+        atualizar_simulacao(TECLAS_POR_MASCARA[mascara])
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        "ticks": len(tempos),
+        "pontos": pontos,
+        "vida": jogador.vida,
+        "estado": estado_jogo,
+        "confere": pontos == replay["pontos"] and jogador.vida == replay["vida"],
+        "tempos": tempos,
+    }
+
+def iniciar_partida(semente=None):
+    global estado_jogo
+    reset_game_state(semente)
+    estado_jogo = "NORMAL"
+
+def simular_headless(ticks, entrada=None, reiniciar=True, semente=None):
+    # Roda a lógica do jogo por N ticks sem desenhar e sem limitar o FPS.
+    # entrada(tick) devolve as teclas pressionadas naquele tick.
+    # Com semente, a partida (e as seguintes, semeadas pelo próprio rng) é reproduzível.
+    if semente is not None or estado_jogo not in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
+        iniciar_partida(semente)
+
+    partidas = 1
+    for tick in range(ticks):
+        keys = entrada(tick) if entrada else SEM_TECLAS
+        atualizar_simulacao(keys)
+
+        if estado_jogo in ["GAME_OVER", "WIN"]:
+            if not reiniciar:
+                break
+            iniciar_partida(None if semente is None else rng.randrange(2 ** 63))
+            partidas += 1
+
+    return {"ticks": tick + 1 if ticks else 0, "partidas": partidas, "estado": estado_jogo, "pontos": pontos}
+
+def tocar_intro():
+    intro_video = "lv_0_20251208094527.mp4"
+    if os.path.exists(intro_video) and recursos.disponivel('video'):
+        try:
+            tocar_video_intro(intro_video)
+        except Exception as e:
+            print("Falha ao reproduzir intro:", e)
+    else:
+        print("Cutscene pulada (OpenCV ausente ou arquivo não existe).")
+
+def relatorio_inicio(limite=15):
+    # A importação é medida num interpretador novo com -X importtime, já que neste processo tudo
+    # já foi importado; o custo de cada módulo (sem os submódulos) é somado por pacote de topo.
+    import subprocess
+    pasta, arquivo = os.path.split(os.path.abspath(__file__))
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {os.path.splitext(arquivo)[0]}"],
+                           capture_output=True, text=True, cwd=pasta,
+                           env={**os.environ, "ROBOT_DEFENSE_HEADLESS": "1"}).stderr
+    por_pacote = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, _, nome = linha[len("import time:"):].split("|")
+        pacote = nome.strip().split(".")[0]
+        tempo, modulos = por_pacote.get(pacote, (0, 0))
+        por_pacote[pacote] = (tempo + int(proprio), modulos + 1)
+
+    total = sum(t for t, _ in por_pacote.values())
+    print(f"início: {total / 1000:.0f} ms importando {sum(m for _, m in por_pacote.values())} módulos")
+    for pacote, (tempo, modulos) in sorted(por_pacote.items(), key=lambda item: item[1][0], reverse=True)[:limite]:
+        print(f"  {pacote:<24} {tempo / 1000:8.1f} ms  {modulos:4} módulo(s)")
+
+    print("recursos opcionais (carregados só quando usados):")
+    for nome, (modulo, _) in recursos.recursos.items():
+        if not recursos.disponivel(nome):
+            print(f"  {nome:<10} {modulo}: ausente")
+            continue
+        ja_carregado = modulo in sys.modules
+        recursos.carregar(nome)
+        ms, novos = recursos.custos.get(nome, (0.0, 0))
+        print(f"  {nome:<10} {modulo}: {ms:.1f} ms, {novos} módulo(s)" + (" (já importado por outro módulo)" if ja_carregado else ""))
+
+rodando = True
+
+def main():
+    global rodando, alpha_interpolacao
+
+    tocar_intro()
+
+    acumulador = 0.0
+    rodando = True
+    while rodando:
+        dt = clock.tick(FPS) / 1000.0
+
+        if estado_jogo not in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
+            acumulador = 0.0
+            if renderizador_sujo is not None:
+                renderizador_sujo.invalidar()
+
+        if estado_jogo == "MENU":
+            tela_inicial()
+            continue
+        
+        if estado_jogo == "COUNTDOWN":
+            contagem_regressiva()
+            continue
+
+        if estado_jogo == "GAME_OVER":
+            tela_game_over(pontos)
+            continue
+
+        if estado_jogo == "WIN":
+            tela_vitoria()
+            continue
+
+        perfilador.iniciar_quadro()
+        musica.atualizar()
+        processar_eventos_jogo()
+        perfilador.marcar('eventos')
+
+        if estado_jogo in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
+            # Limitar o tempo acumulado evita a espiral da morte: se um quadro demorar demais,
+            # o jogo roda no máximo MAX_PASSOS_POR_QUADRO ticks e descarta o resto.
+            acumulador += min(dt, PASSO_SIMULACAO * MAX_PASSOS_POR_QUADRO)
+            keys = pygame.key.get_pressed()
+            mascara = mascara_de_teclas(keys)
+            while acumulador >= PASSO_SIMULACAO and estado_jogo in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
+                guardar_posicoes_anteriores()
+                atualizar_simulacao(keys)
+                gravador.registrar(mascara)
+                acumulador -= PASSO_SIMULACAO
+            if estado_jogo in ["GAME_OVER", "WIN"]:
+                gravador.finalizar()
+            alpha_interpolacao = min(acumulador / PASSO_SIMULACAO, 1.0)
+
+        if estado_jogo in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
+            if renderizador_sujo is not None:
+                renderizador_sujo.desenhar()
+                perfilador.fechar_quadro()
+                continue
+            desenhar_jogo()
+
+        elif estado_jogo == "PAUSED":
+            menu_pausa()
+            # O tempo parado no menu não vira ticks de simulação, e a tela toda precisa voltar
+            clock.tick()
+            if renderizador_sujo is not None:
+                renderizador_sujo.invalidar()
+
+        pygame.display.flip()
+        perfilador.marcar('flip')
+        if estado_jogo in ["NORMAL", "BOSS", "BOSS_INCOMING"]:
+            perfilador.fechar_quadro()
+
+    perfilador.fechar()
+    gravador.finalizar()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Power Rangers: Robot Defense")
+    parser.add_argument("--headless", action="store_true", help="roda a simulação sem janela e sem limite de FPS")
+    parser.add_argument("--numpy", action="store_true", help="move robôs e tiros com o armazém vetorizado (NumPy)")
+    parser.add_argument("--render-parcial", action="store_true", help="atualiza só as áreas da tela que mudaram")
+    parser.add_argument("--fps", type=int, default=FPS, help="quadros desenhados por segundo (não muda a velocidade do jogo)")
+    parser.add_argument("--gerar-cache-assets", action="store_true", help="monta o cache de sprites já escalados e sai")
+    parser.add_argument("--relatorio-inicio", action="store_true", help="mostra quanto cada módulo custa na importação e sai")
+    parser.add_argument("--sem-cache-assets", action="store_true", help="não lê nem grava o cache de sprites")
+    parser.add_argument("--perfil-csv", metavar="ARQUIVO", help="grava o tempo de cada fase por quadro em CSV")
+    parser.add_argument("--ondas", metavar="ARQUIVO", help="lê as ondas de robôs de um JSON (o replay precisa do mesmo arquivo)")
+    parser.add_argument("--gravar", metavar="ARQUIVO", help="grava a partida (semente e teclas por tick) para replay")
+    parser.add_argument("--replay", metavar="ARQUIVO", help="re-simula uma partida gravada, sem janela")
+    parser.add_argument("--ticks", type=int, default=TICKS_POR_SEGUNDO * 60, help="quantidade de ticks simulados no modo headless")
+    parser.add_argument("--semente", type=int, help="semente da primeira partida no modo headless")
+    args = parser.parse_args()
+    if args.ondas:
+        try:
+            agendador.carregar(args.ondas)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    if args.relatorio_inicio:
+        relatorio_inicio()
+        pygame.quit()
+    elif args.gerar_cache_assets:
+        # Passo de build: força também os assets preguiçosos para o cache sair completo
+        for chave in ASSETS_SPRITES:
+            sprites[chave]
+        imagem_agradecimentos()
+        cache_assets.salvar()
+        print(f"cache de assets: {len(cache_assets.entradas) + len(cache_assets.novos)} superfícies em {cache_assets.caminho}")
+        pygame.quit()
+    elif args.replay:
+        inicio = time.perf_counter()
+        resultado = reproduzir_replay(args.replay)
+        duracao = time.perf_counter() - inicio
+        print(f"replay: {resultado['ticks']} ticks em {duracao:.2f}s ({resultado['ticks'] / max(duracao, 1e-9):.0f} ticks/s), "
+              f"estado final {resultado['estado']}, pontos {resultado['pontos']}, vida {resultado['vida']}")
+        print("resultado confere com a gravação" if resultado['confere'] else "ATENÇÃO: resultado diferente da gravação")
+        mais_lentos = sorted(range(len(resultado['tempos'])), key=lambda t: resultado['tempos'][t], reverse=True)[:5]
+        for t in mais_lentos:
+            print(f"  tick {t}: {resultado['tempos'][t] * 1000:.3f} ms")
+        pygame.quit()
+    elif HEADLESS:
+        inicio = time.perf_counter()
+        resultado = simular_headless(args.ticks, semente=args.semente)
+        duracao = time.perf_counter() - inicio
+        print(f"{resultado['ticks']} ticks em {duracao:.2f}s ({resultado['ticks'] / max(duracao, 1e-9):.0f} ticks/s), "
+              f"{resultado['partidas']} partida(s), estado final {resultado['estado']}, pontos {resultado['pontos']}")
+        for nome, dados in pool_sprites.estatisticas().items():
+            print(f"  pool {nome}: {dados['acertos']} reaproveitados, {dados['falhas']} criados, {dados['livres']} livres")
+        for motivo, por_classe in descarte.relatorio().items():
+            print(f"  descarte por {motivo}: " + ", ".join(f"{nome}={n}" for nome, n in sorted(por_classe.items())))
+        pygame.quit()
+    else:
+        FPS = args.fps
+        gravador.caminho = args.gravar
+        perfilador.ativo = True
+        if args.perfil_csv:
+            perfilador.exportar_csv(args.perfil_csv)
+        main()
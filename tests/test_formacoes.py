@@ -0,0 +1,37 @@
+import json
+import os
+
+import pytest
+
+import main
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def formacoes_distribuidas():
+    # Cada formação de cada onda dos arquivos de ondas que vêm com o jogo, com os padrões de compilar()
+    with open(os.path.join(RAIZ, 'ondas_evento.json'), encoding='utf-8') as arquivo:
+        definicao = json.load(arquivo)
+    return [
+        pytest.param({'tipo': f['tipo'], 'quantidade': f.get('quantidade', 1), 'espaco': f.get('espaco', 60)},
+                     id=f"{onda['nome']}-{f['tipo']}")
+        for onda in definicao['ondas']
+        for f in onda['formacoes']
+    ]
+
+
+@pytest.mark.parametrize('formacao', formacoes_distribuidas())
+def test_formacao_entra_na_tela_sem_ser_descartada(formacao):
+    main.iniciar_partida(0)
+    robos = [main.criar_robo('lento', x, y) for x, y in main.posicoes_formacao(formacao, main.LARGURA // 2, -50)]
+    for robo in robos:
+        main.cena.adicionar(robo, main.inimigos)
+
+    for _ in range(main.TICKS_POR_SEGUNDO * 10):
+        if all(robo.rect.bottom > 0 for robo in robos):
+            break
+        main.atualizar_simulacao(main.SEM_TECLAS)
+
+    # Vivos e já na tela: nenhum foi descartado como fora_da_tela antes de aparecer
+    assert all(robo.alive() for robo in robos)
+    assert all(robo.rect.bottom > 0 for robo in robos)
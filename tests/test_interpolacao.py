@@ -0,0 +1,20 @@
+import main
+
+
+def test_sprite_reaproveitado_nao_interpola_da_vida_anterior():
+    main.iniciar_partida(0)
+    powerup = main.pool_sprites.obter(main.PowerUp, 100, 100, 'vida')
+    main.cena.adicionar(powerup, main.powerups)
+    main.guardar_posicoes_anteriores()
+
+    powerup.kill()
+    main.pool_sprites.devolver(powerup)
+    reaproveitado = main.pool_sprites.obter(main.PowerUp, 600, 400, 'vida')
+    main.cena.adicionar(reaproveitado, main.powerups)
+    assert reaproveitado is powerup
+
+    main.alpha_interpolacao = 0.5
+    try:
+        assert tuple(main.posicao_interpolada(reaproveitado))[:2] == reaproveitado.rect.topleft
+    finally:
+        main.alpha_interpolacao = 1.0
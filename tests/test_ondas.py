@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+import main
+
+
+def gravar_ondas(tmp_path, robos, formacoes):
+    caminho = tmp_path / 'ondas.json'
+    caminho.write_text(json.dumps({'ondas': [{'nome': 'teste', 'robos': robos, 'formacoes': formacoes}]}),
+                       encoding='utf-8')
+    return str(caminho)
+
+
+@pytest.mark.parametrize('robos, formacoes', [
+    ({'lento': 0, 'rapido': 0}, []),
+    ({'lento': 2, 'rapido': -1}, []),
+    ({'lento': 1}, [{'tipo': 'linha', 'peso': 0}]),
+    ({'lento': 1}, [{'tipo': 'unico', 'peso': -3}]),
+    ({'lento': "2"}, []),
+])
+def test_pesos_nao_positivos_sao_recusados_ao_carregar(tmp_path, robos, formacoes):
+    agendador = main.AgendadorOndas()
+    with pytest.raises(ValueError, match="peso de"):
+        agendador.carregar(gravar_ondas(tmp_path, robos, formacoes))
+    # O arquivo inválido não substitui as ondas em uso
+    assert agendador.definicao is None
+
+
+def test_pesos_positivos_carregam(tmp_path):
+    agendador = main.AgendadorOndas()
+    agendador.carregar(gravar_ondas(tmp_path, {'lento': 1, 'rapido': 0.5}, [{'tipo': 'linha', 'peso': 2}]))
+    assert [o.nome for o in agendador.ondas] == ['teste']
+
+
+def test_tabela_sem_peso_positivo():
+    with pytest.raises(ValueError):
+        main.TabelaPesos(['lento'], [0])
@@ -0,0 +1,18 @@
+import pygame
+
+import main
+
+
+def test_rects_sobrepostos_contam_uma_vez_so():
+    renderizador = main.RenderizadorSujo()
+    # 300 cópias quase no mesmo lugar: a soma passa muito do limite, a área coberta não
+    rects = [pygame.Rect(100 + i % 5, 100 + i % 7, 300, 300) for i in range(300)]
+    assert sum(r.width * r.height for r in rects) > renderizador.limite_area
+    assert renderizador.area_suja(rects) == 304 * 306
+    assert renderizador.area_suja(rects) <= renderizador.limite_area
+
+
+def test_area_coberta_ignora_o_que_esta_fora_da_tela():
+    renderizador = main.RenderizadorSujo(limite_area=0)
+    rects = [pygame.Rect(-10, -10, 20, 20), pygame.Rect(main.LARGURA - 10, main.ALTURA - 10, 40, 40)]
+    assert renderizador.area_suja(rects) == 100 + 100
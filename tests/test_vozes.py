@@ -0,0 +1,17 @@
+import main
+
+
+def test_canal_tocado_fora_do_gerenciador_pode_ser_roubado():
+    vozes = main.GerenciadorVozes()
+    som = main.audios['clique_botao'] or main.pygame.mixer.Sound(buffer=bytes(44100 * 4))
+    # Canais ocupados por sons que não passaram pelo gerenciador (sem registro em vozes)
+    for canal in vozes.canais:
+        canal.play(som, loops=-1)
+    try:
+        assert all(voz is None for voz in vozes.vozes)
+        indice = vozes.canal_livre(1)
+        assert indice == vozes.reservados
+        assert vozes.canal_livre(main.PRIORIDADE_RESERVADA) == 0
+    finally:
+        for canal in vozes.canais:
+            canal.stop()